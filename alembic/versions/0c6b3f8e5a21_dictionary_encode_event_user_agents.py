@@ -0,0 +1,67 @@
+"""dictionary_encode_event_user_agents
+
+Revision ID: 0c6b3f8e5a21
+Revises: 4a7e0c2d9b15
+Create Date: 2026-10-17 01:47:05.118264
+
+events stored the raw User-Agent header on every row, although a campaign
+only sees a few hundred distinct values. They move to a user_agents table
+keyed by SHA-256, and events keeps an 8-byte user_agent_id instead.
+
+Existing values are copied over before events.user_agent is dropped, so the
+upgrade is lossless. The downgrade restores the text from user_agents.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6b3f8e5a21'
+down_revision: Union[str, Sequence[str], None] = '4a7e0c2d9b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_agents',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('ua_sha256', sa.LargeBinary(length=32), nullable=False),
+        sa.Column('ua_text', sa.Text(), nullable=False),
+        sa.UniqueConstraint('ua_sha256', name='user_agents_ua_sha256_key'),
+    )
+    op.add_column(
+        'events',
+        sa.Column('user_agent_id', sa.BigInteger(), sa.ForeignKey('user_agents.id'), nullable=True),
+    )
+
+    # sha256() is built in since PostgreSQL 11
+    op.execute("""
+        INSERT INTO user_agents (ua_sha256, ua_text)
+        SELECT DISTINCT sha256(convert_to(user_agent, 'UTF8')), user_agent
+        FROM events
+        WHERE user_agent IS NOT NULL AND user_agent <> ''
+    """)
+    op.execute("""
+        UPDATE events
+        SET user_agent_id = ua.id
+        FROM user_agents ua
+        WHERE ua.ua_sha256 = sha256(convert_to(events.user_agent, 'UTF8'))
+    """)
+    op.drop_column('events', 'user_agent')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('events', sa.Column('user_agent', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE events
+        SET user_agent = ua.ua_text
+        FROM user_agents ua
+        WHERE ua.id = events.user_agent_id
+    """)
+    op.drop_column('events', 'user_agent_id')
+    op.drop_table('user_agents')
@@ -0,0 +1,44 @@
+"""index_campaigns_on_landing_page_and_status
+
+Revision ID: 1b5d8f2a6c47
+Revises: 7a1c4e9f2b63
+Create Date: 2026-10-17 00:41:26.207719
+
+The phishing server looks up the active campaign for the active landing page
+(landing_page_id = ? AND status = 'active') on every request. A composite
+index answers that directly and, leading with landing_page_id, replaces the
+single-column foreign-key index.
+
+Indexes are built CONCURRENTLY so the table stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b5d8f2a6c47'
+down_revision: Union[str, Sequence[str], None] = '7a1c4e9f2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_campaigns_landing_page_id_status '
+            'ON campaigns (landing_page_id, status)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_campaigns_landing_page_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_campaigns_landing_page_id '
+            'ON campaigns (landing_page_id)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_campaigns_landing_page_id_status')
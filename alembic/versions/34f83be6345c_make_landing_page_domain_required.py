@@ -4,6 +4,11 @@ Revision ID: 34f83be6345c
 Revises: 2c0f11d5f148
 Create Date: 2026-01-23 11:43:09.516328
 
+a3f194afe90f now creates the column NOT NULL, so this is a no-op on fresh
+databases. Databases that ran the earlier nullable version get the constraint
+through a NOT VALID check that is validated separately. The validation scan
+only takes a SHARE UPDATE EXCLUSIVE lock. SET NOT NULL then reuses the
+validated check instead of scanning under ACCESS EXCLUSIVE.
 """
 from typing import Sequence, Union
 
@@ -18,12 +23,46 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+DOMAIN_IS_NULLABLE = '''
+    EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'landing_pages' AND column_name = 'domain'
+          AND is_nullable = 'YES'
+    )
+'''
+
+
 def upgrade() -> None:
     """Upgrade schema."""
-    # Make landing_pages.domain column NOT NULL
-    op.alter_column('landing_pages', 'domain',
-               existing_type=sa.String(length=255),
-               nullable=False)
+    # Make landing_pages.domain column NOT NULL; each step commits on its own
+    # so the ACCESS EXCLUSIVE locks stay short
+    with op.get_context().autocommit_block():
+        op.execute(f'''
+            DO $$ BEGIN
+                IF {DOMAIN_IS_NULLABLE} THEN
+                    ALTER TABLE landing_pages
+                        ADD CONSTRAINT landing_pages_domain_not_null
+                        CHECK (domain IS NOT NULL) NOT VALID;
+                END IF;
+            END $$
+        ''')
+        op.execute(f'''
+            DO $$ BEGIN
+                IF {DOMAIN_IS_NULLABLE} THEN
+                    ALTER TABLE landing_pages VALIDATE CONSTRAINT landing_pages_domain_not_null;
+                END IF;
+            END $$
+        ''')
+        op.execute(f'''
+            DO $$ BEGIN
+                IF {DOMAIN_IS_NULLABLE} THEN
+                    ALTER TABLE landing_pages ALTER COLUMN domain SET NOT NULL;
+                END IF;
+            END $$
+        ''')
+        op.execute(
+            'ALTER TABLE landing_pages DROP CONSTRAINT IF EXISTS landing_pages_domain_not_null'
+        )
 
 
 def downgrade() -> None:
@@ -0,0 +1,38 @@
+"""store_landing_page_content_out_of_line
+
+Revision ID: 3e9a7c5d1f20
+Revises: f2d84a6c9e13
+Create Date: 2026-10-16 23:24:09.518342
+
+Legacy landing pages keep their HTML/CSS/JS in landing_pages, and the HTML
+routinely exceeds the TOAST threshold. The models now defer these columns so
+listings and lookups never read them. Switching their storage to EXTERNAL
+keeps them out of line but uncompressed, so serving a legacy page no longer
+pays for decompression. The new strategy applies to values written from now
+on; existing rows are rewritten the next time they are updated.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9a7c5d1f20'
+down_revision: Union[str, Sequence[str], None] = 'f2d84a6c9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CONTENT_COLUMNS = ('html_content', 'css_content', 'js_content')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in CONTENT_COLUMNS:
+        op.execute(f'ALTER TABLE landing_pages ALTER COLUMN {column} SET STORAGE EXTERNAL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in CONTENT_COLUMNS:
+        op.execute(f'ALTER TABLE landing_pages ALTER COLUMN {column} SET STORAGE EXTENDED')
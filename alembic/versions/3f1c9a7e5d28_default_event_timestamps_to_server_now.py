@@ -0,0 +1,38 @@
+"""default_event_timestamps_to_server_now
+
+Revision ID: 3f1c9a7e5d28
+Revises: 8e3b6d1f4a90
+Create Date: 2026-10-17 03:34:52.560113
+
+events.created_at and form_submissions.submitted_at get a server default of
+the current UTC time (the columns are naive UTC timestamps), so single-row
+inserts from the phishing server no longer compute and send the timestamp.
+
+SET DEFAULT on the partitioned events table applies to every partition and
+only changes the catalog; no rows are rewritten.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e5d28'
+down_revision: Union[str, Sequence[str], None] = '8e3b6d1f4a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UTC_NOW = "(now() AT TIME ZONE 'utc')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f'ALTER TABLE events ALTER COLUMN created_at SET DEFAULT {UTC_NOW}')
+    op.execute(f'ALTER TABLE form_submissions ALTER COLUMN submitted_at SET DEFAULT {UTC_NOW}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE form_submissions ALTER COLUMN submitted_at DROP DEFAULT')
+    op.execute('ALTER TABLE events ALTER COLUMN created_at DROP DEFAULT')
@@ -0,0 +1,39 @@
+"""index_targets_on_lower_email
+
+Revision ID: 4a7e0c2d9b15
+Revises: 1b5d8f2a6c47
+Create Date: 2026-10-17 01:12:48.530911
+
+Target imports match existing targets by lower(email). The unique index on
+email is case-sensitive and cannot serve that predicate, so add an expression
+index on lower(email). It is not unique: existing rows may already differ
+only in case.
+
+The index is built CONCURRENTLY so the table stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7e0c2d9b15'
+down_revision: Union[str, Sequence[str], None] = '1b5d8f2a6c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_targets_lower_email '
+            'ON targets (lower(email))'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_targets_lower_email')
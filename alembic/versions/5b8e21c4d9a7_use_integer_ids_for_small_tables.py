@@ -0,0 +1,92 @@
+"""use_integer_ids_for_small_tables
+
+Revision ID: 5b8e21c4d9a7
+Revises: eae0bfaf3e80
+Create Date: 2026-10-16 20:40:35.118204
+
+Admin users, departments, event types, templates, landing pages, campaigns
+and form definitions never grow past a few thousand rows, so their keys and
+every foreign key pointing at them are narrowed from bigint to integer. This
+shrinks the rows and indexes of the high-volume tables (campaign_targets,
+events) that reference them. Fact-table keys stay bigint.
+
+All columns of a table are altered in one statement so each table is
+rewritten only once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e21c4d9a7'
+down_revision: Union[str, Sequence[str], None] = 'eae0bfaf3e80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose own primary key becomes integer
+SMALL_TABLES = [
+    'admin_users',
+    'departments',
+    'event_types',
+    'email_templates',
+    'landing_pages',
+    'campaigns',
+    'form_templates',
+    'form_questions',
+]
+
+# Every column narrowed to integer, grouped by table
+INTEGER_COLUMNS = {
+    'admin_users': ['id'],
+    'departments': ['id'],
+    'targets': ['department_id'],
+    'target_lists': ['created_by_id'],
+    'email_templates': ['id', 'created_by_id', 'default_landing_page_id'],
+    'landing_pages': ['id', 'created_by_id'],
+    'active_configuration': ['active_landing_page_id', 'activated_by_id'],
+    'campaigns': ['id', 'created_by_id', 'email_template_id', 'landing_page_id'],
+    'campaign_target_lists': ['campaign_id'],
+    'campaign_targets': ['campaign_id'],
+    'event_types': ['id'],
+    'events': ['event_type_id'],
+    'form_templates': ['id', 'landing_page_id', 'created_by_id'],
+    'form_questions': ['id', 'form_template_id'],
+    'form_submissions': ['form_template_id'],
+    'form_answers': ['form_question_id'],
+}
+
+
+def _alter_types(type_name: str) -> None:
+    for table, columns in INTEGER_COLUMNS.items():
+        clauses = ', '.join(f'ALTER COLUMN {column} TYPE {type_name}' for column in columns)
+        op.execute(f'ALTER TABLE {table} {clauses}')
+
+
+def _alter_sequences(type_name: str) -> None:
+    # The serial sequences were created as bigint and must match the column
+    for table in SMALL_TABLES:
+        op.execute(f"""
+            DO $$
+            DECLARE seq text := pg_get_serial_sequence('{table}', 'id');
+            BEGIN
+                IF seq IS NOT NULL THEN
+                    EXECUTE format('ALTER SEQUENCE %s AS {type_name}', seq);
+                END IF;
+            END $$
+        """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL rebuilds the dependent foreign keys and indexes as part of
+    # each ALTER COLUMN TYPE; bigint and integer keys stay comparable meanwhile
+    _alter_types('integer')
+    _alter_sequences('integer')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _alter_sequences('bigint')
+    _alter_types('bigint')
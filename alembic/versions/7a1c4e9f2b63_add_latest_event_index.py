@@ -0,0 +1,61 @@
+"""add_latest_event_index
+
+Revision ID: 7a1c4e9f2b63
+Revises: 3e9a7c5d1f20
+Create Date: 2026-10-17 00:08:52.614027
+
+"Has this target clicked / when did it last open?" lookups filter events on
+(campaign_target_id, event_type_id) and take the newest row. A composite
+index on those columns plus created_at DESC, INCLUDE (id), answers them with
+an index-only scan. It also leads with campaign_target_id, so the old
+single-column index is redundant and dropped to save work on every insert.
+
+events is partitioned, and CREATE INDEX CONCURRENTLY is not supported on a
+partitioned parent. The parent index is therefore created ON ONLY events
+(invalid until complete). Each partition's index is then built concurrently
+and attached. Partitions created later inherit the index automatically.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c4e9f2b63'
+down_revision: Union[str, Sequence[str], None] = '3e9a7c5d1f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'ix_events_ct_type_time'
+INDEX_DEFINITION = '(campaign_target_id, event_type_id, created_at DESC) INCLUDE (id)'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY events {INDEX_DEFINITION}')
+
+        partitions = op.get_bind().execute(sa.text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'events'::regclass"
+        )).scalars().all()
+        for partition in partitions:
+            partition_index = f'{partition}_ct_type_time_idx'
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} '
+                f'ON {partition} {INDEX_DEFINITION}'
+            )
+            op.execute(f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition_index}')
+
+    op.execute('DROP INDEX IF EXISTS ix_events_campaign_target_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_events_campaign_target_id ON events (campaign_target_id)'
+    )
+    op.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
@@ -0,0 +1,48 @@
+"""cover_campaign_id_in_landing_page_status_index
+
+Revision ID: 8e3b6d1f4a90
+Revises: d5a1e8c7b304
+Create Date: 2026-10-17 02:51:08.194237
+
+The active-campaign lookup selects only campaigns.id for
+(landing_page_id = ? AND status = 'active'). Carrying id in the composite
+index as an INCLUDE column lets PostgreSQL answer it with an index-only scan
+instead of visiting the heap for every match.
+
+The covering index is built CONCURRENTLY under a temporary name, then takes
+over the existing name, so the lookup is never left without an index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b6d1f4a90'
+down_revision: Union[str, Sequence[str], None] = 'd5a1e8c7b304'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'ix_campaigns_landing_page_id_status'
+
+
+def _rebuild(include: str) -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}_new '
+            f'ON campaigns (landing_page_id, status){include}'
+        )
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+        op.execute(f'ALTER INDEX {INDEX_NAME}_new RENAME TO {INDEX_NAME}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild(' INCLUDE (id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild('')
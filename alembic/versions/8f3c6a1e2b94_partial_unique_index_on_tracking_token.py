@@ -0,0 +1,44 @@
+"""partial_unique_index_on_tracking_token
+
+Revision ID: 8f3c6a1e2b94
+Revises: 5b8e21c4d9a7
+Create Date: 2026-10-16 21:05:12.640377
+
+campaign_targets.tracking_token stays NULL until the worker sends the email,
+yet the unique constraint's btree stores an entry for every one of those
+NULLs. Replace it with a unique index restricted to assigned tokens.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3c6a1e2b94'
+down_revision: Union[str, Sequence[str], None] = '5b8e21c4d9a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_campaign_targets_tracking_token '
+            'ON campaign_targets (tracking_token) WHERE tracking_token IS NOT NULL'
+        )
+    # Unnamed constraint created by 6d2919baffcc
+    op.execute(
+        'ALTER TABLE campaign_targets '
+        'DROP CONSTRAINT IF EXISTS campaign_targets_tracking_token_key'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint(
+        'campaign_targets_tracking_token_key', 'campaign_targets', ['tracking_token']
+    )
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_campaign_targets_tracking_token')
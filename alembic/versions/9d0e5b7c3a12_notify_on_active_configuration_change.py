@@ -0,0 +1,43 @@
+"""notify_on_active_configuration_change
+
+Revision ID: 9d0e5b7c3a12
+Revises: c41d7e9a0f36
+Create Date: 2026-10-16 21:41:03.227615
+
+The phishing server caches the active_configuration row in memory. Any write
+to the table sends a NOTIFY on active_config_changed so every process drops
+its cached copy once the write commits.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d0e5b7c3a12'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e9a0f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_active_config_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('active_config_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER active_config_changed
+        AFTER INSERT OR UPDATE OR DELETE ON active_configuration
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_active_config_changed()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS active_config_changed ON active_configuration')
+    op.execute('DROP FUNCTION IF EXISTS notify_active_config_changed()')
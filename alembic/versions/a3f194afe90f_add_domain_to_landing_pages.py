@@ -4,6 +4,9 @@ Revision ID: a3f194afe90f
 Revises: 2d7079e0cbf5
 Create Date: 2026-01-20 20:56:43.776061
 
+The column is added NOT NULL with a constant default, which PostgreSQL 11+
+records in the catalog without rewriting or scanning the table. The default
+is dropped straight away so new rows must still supply a domain.
 """
 from typing import Sequence, Union
 
@@ -21,7 +24,11 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # Add domain column to landing_pages table
-    op.add_column('landing_pages', sa.Column('domain', sa.String(length=255), nullable=True))
+    op.add_column(
+        'landing_pages',
+        sa.Column('domain', sa.String(length=255), nullable=False, server_default=''),
+    )
+    op.alter_column('landing_pages', 'domain', server_default=None)
 
 
 def downgrade() -> None:
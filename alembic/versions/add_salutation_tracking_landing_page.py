@@ -53,38 +53,28 @@ def upgrade():
         )
     )
 
-    # Add anonymous_visit event type
+    # Add anonymous_visit and anonymous_submission event types
     op.execute("""
         INSERT INTO event_types (name, description, created_at)
-        VALUES (
-            'anonymous_visit',
-            'Landing page accessed without valid tracking token',
-            NOW()
-        )
-        ON CONFLICT (name) DO NOTHING
-    """)
-
-    # Add anonymous_submission event type
-    op.execute("""
-        INSERT INTO event_types (name, description, created_at)
-        VALUES (
-            'anonymous_submission',
-            'Form submitted without valid tracking token',
-            NOW()
-        )
+        VALUES
+            (
+                'anonymous_visit',
+                'Landing page accessed without valid tracking token',
+                NOW()
+            ),
+            (
+                'anonymous_submission',
+                'Form submitted without valid tracking token',
+                NOW()
+            )
         ON CONFLICT (name) DO NOTHING
     """)
 
 
 def downgrade():
-    # Remove anonymous_submission event type
-    op.execute("""
-        DELETE FROM event_types WHERE name = 'anonymous_submission'
-    """)
-
-    # Remove anonymous_visit event type
+    # Remove anonymous_submission and anonymous_visit event types
     op.execute("""
-        DELETE FROM event_types WHERE name = 'anonymous_visit'
+        DELETE FROM event_types WHERE name IN ('anonymous_submission', 'anonymous_visit')
     """)
 
     # Remove default_landing_page_id from email_templates
@@ -0,0 +1,114 @@
+"""partition_events_by_month
+
+Revision ID: b6f19d3e7a48
+Revises: e7a2f4c81b05
+Create Date: 2026-10-16 22:31:16.083927
+
+events is the highest-volume, append-only table. It is rebuilt as a table
+partitioned by RANGE (created_at), with one partition per month and a
+default partition for anything outside them. Per-campaign and time-window
+scans then prune to the months they touch, and old months can be detached
+or dropped without a bulk DELETE.
+
+The surrogate id is kept because campaign_target_id is NULL for anonymous
+visits, so it cannot be part of a key. The primary key becomes
+(id, created_at) since it must include the partition key.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f19d3e7a48'
+down_revision: Union[str, Sequence[str], None] = 'e7a2f4c81b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = (
+    'id, campaign_target_id, event_type_id, ip_address, user_agent, '
+    'browser, os, device_type, location, created_at'
+)
+
+COLUMN_DEFINITIONS = """
+    id bigint NOT NULL DEFAULT nextval('events_id_seq'),
+    campaign_target_id bigint REFERENCES campaign_targets (id),
+    event_type_id integer REFERENCES event_types (id),
+    ip_address varchar(45),
+    user_agent text,
+    browser varchar(100),
+    os varchar(100),
+    device_type varchar(50),
+    location varchar(255),
+    created_at timestamp without time zone NOT NULL
+"""
+
+
+def _rename_existing(suffix: str) -> None:
+    op.execute(f'ALTER TABLE events RENAME TO events_{suffix}')
+    op.execute(f'ALTER INDEX events_pkey RENAME TO events_{suffix}_pkey')
+    for column in ('campaign_target_id', 'event_type_id'):
+        op.execute(
+            f'ALTER INDEX IF EXISTS ix_events_{column} RENAME TO ix_events_{suffix}_{column}'
+        )
+
+
+def _create_indexes() -> None:
+    op.execute('CREATE INDEX ix_events_campaign_target_id ON events (campaign_target_id)')
+    op.execute('CREATE INDEX ix_events_event_type_id ON events (event_type_id)')
+
+
+def _copy_and_drop(suffix: str) -> None:
+    op.execute(f'INSERT INTO events ({COLUMNS}) SELECT {COLUMNS} FROM events_{suffix}')
+    op.execute('ALTER SEQUENCE events_id_seq OWNED BY events.id')
+    op.execute(f'DROP TABLE events_{suffix}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_existing('legacy')
+
+    op.execute(f"""
+        CREATE TABLE events ({COLUMN_DEFINITIONS},
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    _create_indexes()
+    op.execute('CREATE TABLE events_default PARTITION OF events DEFAULT')
+
+    # One partition per month from the oldest event through three months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date;
+        BEGIN
+            FOR month_start IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE((SELECT min(created_at) FROM events_legacy), now())),
+                    date_trunc('month', now()) + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF events FOR VALUES FROM (%L) TO (%L)',
+                    'events_' || to_char(month_start, '"y"YYYY"m"MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+
+    _copy_and_drop('legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rename_existing('partitioned')
+
+    op.execute(f'CREATE TABLE events ({COLUMN_DEFINITIONS}, PRIMARY KEY (id))')
+    _create_indexes()
+
+    # Dropping the parent drops every partition with it
+    _copy_and_drop('partitioned')
@@ -0,0 +1,37 @@
+"""denormalize_question_text_onto_form_answers
+
+Revision ID: e7a2f4c81b05
+Revises: 9d0e5b7c3a12
+Create Date: 2026-10-16 22:03:58.511642
+
+Reports list each answer next to its question. Copying the question text
+onto form_answers lets them read submissions without joining form_questions.
+form_question_id stays for referential integrity.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2f4c81b05'
+down_revision: Union[str, Sequence[str], None] = '9d0e5b7c3a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('form_answers', sa.Column('question_text', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE form_answers
+        SET question_text = fq.question_text
+        FROM form_questions fq
+        WHERE fq.id = form_answers.form_question_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('form_answers', 'question_text')
@@ -0,0 +1,66 @@
+"""add_foreign_key_indexes
+
+Revision ID: eae0bfaf3e80
+Revises: 34f83be6345c
+Create Date: 2026-10-16 09:12:31.402118
+
+PostgreSQL does not index foreign-key columns automatically, so joins and
+cascade checks on these columns fall back to sequential scans. Columns that
+lead a composite unique constraint are already covered and are skipped.
+
+Indexes are built CONCURRENTLY so existing tables stay writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eae0bfaf3e80'
+down_revision: Union[str, Sequence[str], None] = '34f83be6345c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs; index names follow SQLAlchemy's ix_<table>_<column>
+FOREIGN_KEY_COLUMNS = [
+    ('targets', 'department_id'),
+    ('target_lists', 'created_by_id'),
+    ('target_list_members', 'target_id'),
+    ('email_templates', 'created_by_id'),
+    ('email_templates', 'default_landing_page_id'),
+    ('landing_pages', 'created_by_id'),
+    ('campaigns', 'created_by_id'),
+    ('campaigns', 'email_template_id'),
+    ('campaigns', 'landing_page_id'),
+    ('campaign_target_lists', 'target_list_id'),
+    ('campaign_targets', 'target_id'),
+    ('email_jobs', 'campaign_target_id'),
+    ('events', 'campaign_target_id'),
+    ('events', 'event_type_id'),
+    ('form_templates', 'landing_page_id'),
+    ('form_templates', 'created_by_id'),
+    ('form_questions', 'form_template_id'),
+    ('form_submissions', 'campaign_target_id'),
+    ('form_submissions', 'form_template_id'),
+    ('form_answers', 'form_submission_id'),
+    ('form_answers', 'form_question_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table, column in FOREIGN_KEY_COLUMNS:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column} '
+                f'ON {table} ({column})'
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column in reversed(FOREIGN_KEY_COLUMNS):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}')
@@ -0,0 +1,130 @@
+"""add_campaign_event_counts
+
+Revision ID: f2d84a6c9e13
+Revises: b6f19d3e7a48
+Create Date: 2026-10-16 23:02:41.730158
+
+Dashboards count opens/clicks/submissions per campaign with
+COUNT(DISTINCT campaign_target_id) over events on every page load. Keep
+those totals in campaign_event_counts instead, maintained by a trigger on
+events. campaign_target_first_events records each target's first event of
+every type so distinct targets are counted exactly once.
+
+The trigger is statement-level over the inserted rows: a batch updates each
+counter row once, locking them in (campaign_id, event_type_id) order, so
+concurrent batches cannot deadlock on the shared counters.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d84a6c9e13'
+down_revision: Union[str, Sequence[str], None] = 'b6f19d3e7a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'campaign_event_counts',
+        sa.Column('campaign_id', sa.Integer(),
+                  sa.ForeignKey('campaigns.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('event_type_id', sa.Integer(),
+                  sa.ForeignKey('event_types.id'), primary_key=True),
+        sa.Column('event_count', sa.BigInteger(), nullable=False),
+        sa.Column('target_count', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        'ix_campaign_event_counts_event_type_id', 'campaign_event_counts', ['event_type_id']
+    )
+    op.create_table(
+        'campaign_target_first_events',
+        sa.Column('campaign_target_id', sa.BigInteger(),
+                  sa.ForeignKey('campaign_targets.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('event_type_id', sa.Integer(),
+                  sa.ForeignKey('event_types.id'), primary_key=True),
+        sa.Column('first_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        'ix_campaign_target_first_events_event_type_id',
+        'campaign_target_first_events',
+        ['event_type_id'],
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_campaign_event() RETURNS trigger AS $$
+        BEGIN
+            WITH batch AS (
+                SELECT ct.campaign_id, e.campaign_target_id, e.event_type_id,
+                       count(*) AS event_count, min(e.created_at) AS first_at
+                FROM inserted_events e
+                JOIN campaign_targets ct ON ct.id = e.campaign_target_id
+                WHERE ct.campaign_id IS NOT NULL
+                GROUP BY ct.campaign_id, e.campaign_target_id, e.event_type_id
+            ),
+            first_events AS (
+                INSERT INTO campaign_target_first_events
+                    (campaign_target_id, event_type_id, first_at)
+                SELECT campaign_target_id, event_type_id, first_at
+                FROM batch
+                ORDER BY campaign_target_id, event_type_id
+                ON CONFLICT DO NOTHING
+                RETURNING campaign_target_id, event_type_id
+            )
+            INSERT INTO campaign_event_counts AS c
+                (campaign_id, event_type_id, event_count, target_count, updated_at)
+            SELECT b.campaign_id, b.event_type_id, sum(b.event_count),
+                   count(f.campaign_target_id), now()
+            FROM batch b
+            LEFT JOIN first_events f
+                ON f.campaign_target_id = b.campaign_target_id AND f.event_type_id = b.event_type_id
+            GROUP BY b.campaign_id, b.event_type_id
+            ORDER BY b.campaign_id, b.event_type_id
+            ON CONFLICT (campaign_id, event_type_id) DO UPDATE
+            SET event_count = c.event_count + EXCLUDED.event_count,
+                target_count = c.target_count + EXCLUDED.target_count,
+                updated_at = EXCLUDED.updated_at;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Block event writes until the backfill and trigger are both in place
+    op.execute('LOCK TABLE events IN SHARE MODE')
+    op.execute("""
+        INSERT INTO campaign_target_first_events (campaign_target_id, event_type_id, first_at)
+        SELECT campaign_target_id, event_type_id, min(created_at)
+        FROM events
+        WHERE campaign_target_id IS NOT NULL
+        GROUP BY campaign_target_id, event_type_id
+    """)
+    op.execute("""
+        INSERT INTO campaign_event_counts
+            (campaign_id, event_type_id, event_count, target_count, updated_at)
+        SELECT ct.campaign_id, e.event_type_id, count(*),
+               count(DISTINCT e.campaign_target_id), now()
+        FROM events e
+        JOIN campaign_targets ct ON ct.id = e.campaign_target_id
+        WHERE ct.campaign_id IS NOT NULL
+        GROUP BY ct.campaign_id, e.event_type_id
+    """)
+    op.execute("""
+        CREATE TRIGGER count_campaign_event
+        AFTER INSERT ON events
+        REFERENCING NEW TABLE AS inserted_events
+        FOR EACH STATEMENT EXECUTE FUNCTION count_campaign_event()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS count_campaign_event ON events')
+    op.execute('DROP FUNCTION IF EXISTS count_campaign_event()')
+    op.drop_table('campaign_target_first_events')
+    op.drop_table('campaign_event_counts')
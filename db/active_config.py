@@ -0,0 +1,138 @@
+"""
+In-process cache for the active_configuration singleton row.
+
+The phishing server resolves the active landing page on nearly every request,
+but the row only changes when an admin activates a page. The cache keeps a
+detached snapshot of the row and drops it when:
+
+- the row is written through the ORM in this process (mapper events),
+- PostgreSQL sends a NOTIFY on ``active_config_changed`` (trigger added in
+  migration 9d0e5b7c3a12), covering writes from other processes,
+- the snapshot is older than ``max_age`` seconds, as a safety net if the
+  listener connection is down.
+
+The model is passed in so services with their own declarative models can share
+this module.
+"""
+
+import logging
+import select
+import threading
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import event, inspect
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "active_config_changed"
+
+
+class ActiveConfigCache:
+    """Cached snapshot of the singleton ActiveConfiguration row (id = 1)."""
+
+    def __init__(self, model, max_age=300):
+        """
+        Initialize the cache and watch the model for writes in this process.
+
+        Args:
+            model: Mapped ActiveConfiguration class
+            max_age: Seconds a snapshot is served before it is reloaded (default: 300)
+        """
+        self.model = model
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._listener = None
+
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, name, self._on_write)
+
+    def _on_write(self, mapper, connection, target):
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next read goes to the database."""
+        with self._lock:
+            self._loaded_at = 0.0
+            self._generation += 1
+
+    def get(self, session):
+        """
+        Return the active configuration as a read-only snapshot.
+
+        Args:
+            session: SQLAlchemy session used on a cache miss
+
+        Returns:
+            SimpleNamespace with the row's column attributes, or None if the row is missing
+        """
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.max_age:
+                return self._snapshot
+            generation = self._generation
+
+        row = session.query(self.model).filter(self.model.id == 1).first()
+        snapshot = None
+        if row is not None:
+            snapshot = SimpleNamespace(
+                **{attr.key: getattr(row, attr.key) for attr in inspect(self.model).column_attrs}
+            )
+
+        with self._lock:
+            # Don't cache a row read before an invalidation that raced with it
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+        return snapshot
+
+    def listen(self, engine):
+        """
+        Start a daemon thread that invalidates the cache on NOTIFY.
+
+        Args:
+            engine: psycopg2- or psycopg-backed engine; one connection is detached from its pool
+        """
+        if self._listener is not None:
+            return
+        self._listener = threading.Thread(
+            target=self._listen_forever, args=(engine,), name="active-config-listener", daemon=True
+        )
+        self._listener.start()
+
+    def _listen_forever(self, engine):
+        while True:
+            conn = None
+            try:
+                conn = engine.raw_connection()
+                conn.detach()
+                dbapi_conn = conn.driver_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                # Anything may have changed while we were not listening
+                self.invalidate()
+
+                if not hasattr(dbapi_conn, "poll"):
+                    # psycopg 3: notifies() blocks until a notification arrives
+                    for _ in dbapi_conn.notifies():
+                        self.invalidate()
+                    raise ConnectionError("notification stream ended")
+
+                while True:
+                    if select.select([dbapi_conn], [], [], 60) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    if dbapi_conn.notifies:
+                        dbapi_conn.notifies.clear()
+                        self.invalidate()
+            except Exception as e:
+                logger.warning(f"Active configuration listener error, reconnecting: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
@@ -0,0 +1,76 @@
+"""
+Batched bulk inserts and updates for the high-volume tables in db.models.
+
+SQLAlchemy 2.x sends an ``insert()`` executed with a list of parameter
+dictionaries through its "insertmanyvalues" path, folding each batch into a
+single multi-row ``INSERT ... VALUES (...), (...)`` instead of one statement per
+ORM object.
+
+Updates have no such path, so ``bulk_update`` joins the table against an inline
+``VALUES`` list and sends one ``UPDATE ... FROM (VALUES ...)`` per batch.
+"""
+
+from itertools import islice
+
+from sqlalchemy import column, inspect, insert, update, values
+
+
+def bulk_insert(session, model, rows, batch_size=10_000, returning=None):
+    """
+    Insert rows for a mapped model in batches of ``batch_size``.
+
+    Args:
+        session: Active SQLAlchemy session (the caller commits)
+        model: Mapped class to insert into
+        rows: Iterable of dicts keyed by column attribute name
+        batch_size: Maximum number of rows sent per statement
+        returning: Optional sequence of columns to return for the inserted rows
+
+    Returns:
+        list: The RETURNING rows when ``returning`` is given, otherwise an empty list
+    """
+    stmt = insert(model)
+    if returning:
+        stmt = stmt.returning(*returning)
+
+    result = []
+    rows = iter(rows)
+    while chunk := list(islice(rows, batch_size)):
+        res = session.execute(stmt, chunk)
+        if returning:
+            result.extend(res.all())
+    return result
+
+
+def bulk_update(session, model, rows, key="id", batch_size=1_000):
+    """
+    Update rows of a mapped model with one ``UPDATE ... FROM (VALUES ...)`` per batch.
+
+    Args:
+        session: Active SQLAlchemy session (the caller commits)
+        model: Mapped class to update
+        rows: Iterable of dicts holding ``key`` and the columns to set; every
+            dict must have the same keys
+        key: Column matched against the table to find each row
+        batch_size: Maximum number of rows sent per statement
+
+    Returns:
+        int: Number of rows updated
+
+    ORM objects already loaded in the session are not refreshed.
+    """
+    table = inspect(model).local_table
+    rows = iter(rows)
+    updated = 0
+    while chunk := list(islice(rows, batch_size)):
+        names = list(chunk[0])
+        data = values(*(column(name, table.c[name].type) for name in names), name="v").data(
+            [tuple(row[name] for name in names) for row in chunk]
+        )
+        stmt = (
+            update(table)
+            .where(table.c[key] == data.c[key])
+            .values({name: data.c[name] for name in names if name != key})
+        )
+        updated += session.execute(stmt).rowcount
+    return updated
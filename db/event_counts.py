@@ -0,0 +1,78 @@
+"""
+Trigger-maintained per-campaign event counters.
+
+Every row inserted into events (by the phishing server, the worker or the
+webadmin) bumps campaign_event_counts for its campaign and event type:
+
+- event_count counts every event,
+- target_count counts distinct campaign targets. A target only counts the
+  first time it produces a given event type, which is recorded in
+  campaign_target_first_events with ON CONFLICT DO NOTHING, so concurrent
+  first hits are counted once.
+
+A database trigger is used rather than an ORM event because the services
+insert events through different models. Dashboards read the counters instead
+of running COUNT(DISTINCT ...) over events.
+
+The trigger runs once per statement over the inserted rows, so a batch of
+events (e.g. the phishing server's COPY) updates each counter row once, and
+always locks counter rows in (campaign_id, event_type_id) order: concurrent
+batches queue behind each other instead of deadlocking.
+"""
+
+from sqlalchemy import text
+
+COUNT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION count_campaign_event() RETURNS trigger AS $$
+BEGIN
+    WITH batch AS (
+        SELECT ct.campaign_id, e.campaign_target_id, e.event_type_id,
+               count(*) AS event_count, min(e.created_at) AS first_at
+        FROM inserted_events e
+        JOIN campaign_targets ct ON ct.id = e.campaign_target_id
+        WHERE ct.campaign_id IS NOT NULL
+        GROUP BY ct.campaign_id, e.campaign_target_id, e.event_type_id
+    ),
+    first_events AS (
+        INSERT INTO campaign_target_first_events
+            (campaign_target_id, event_type_id, first_at)
+        SELECT campaign_target_id, event_type_id, first_at
+        FROM batch
+        ORDER BY campaign_target_id, event_type_id
+        ON CONFLICT DO NOTHING
+        RETURNING campaign_target_id, event_type_id
+    )
+    INSERT INTO campaign_event_counts AS c
+        (campaign_id, event_type_id, event_count, target_count, updated_at)
+    SELECT b.campaign_id, b.event_type_id, sum(b.event_count),
+           count(f.campaign_target_id), now()
+    FROM batch b
+    LEFT JOIN first_events f
+        ON f.campaign_target_id = b.campaign_target_id AND f.event_type_id = b.event_type_id
+    GROUP BY b.campaign_id, b.event_type_id
+    ORDER BY b.campaign_id, b.event_type_id
+    ON CONFLICT (campaign_id, event_type_id) DO UPDATE
+    SET event_count = c.event_count + EXCLUDED.event_count,
+        target_count = c.target_count + EXCLUDED.target_count,
+        updated_at = EXCLUDED.updated_at;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COUNT_TRIGGER_SQL = """
+CREATE TRIGGER count_campaign_event
+AFTER INSERT ON events
+REFERENCING NEW TABLE AS inserted_events
+FOR EACH STATEMENT EXECUTE FUNCTION count_campaign_event()
+"""
+
+
+def install_event_count_trigger(target, connection, **kw):
+    """Metadata after_create hook so create_all() installs the counting trigger."""
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text(COUNT_FUNCTION_SQL))
+    connection.execute(text("DROP TRIGGER IF EXISTS count_campaign_event ON events"))
+    connection.execute(text(COUNT_TRIGGER_SQL))
@@ -0,0 +1,27 @@
+"""
+Loader-strategy helpers shared by the services querying db.models.
+
+Several collections on the models default to lazy="selectin", so a query that
+forgets to name its loaders either eager-loads more than it needs or falls
+back to one lazy SELECT per row. ``strict`` makes the loaders explicit and
+turns any relationship access that was not planned for into an error.
+"""
+
+from sqlalchemy.orm import raiseload
+
+
+def strict(stmt, *loaders):
+    """
+    Apply the given loader options and raise on every other relationship.
+
+    Args:
+        stmt: A select() statement or legacy Query over one of the models
+        *loaders: Loader options (selectinload, joinedload, ...) the caller needs
+
+    Returns:
+        The statement with ``raiseload("*")`` appended after the loaders
+
+    Nested loaders keep their related mapper's defaults; chain
+    ``.raiseload("*")`` onto them to guard the next level as well.
+    """
+    return stmt.options(*loaders, raiseload("*"))
@@ -2,23 +2,73 @@ from sqlalchemy import (
     BigInteger,
     Column,
     ForeignKey,
+    Index,
     UniqueConstraint,
     String,
     Text,
     DateTime,
     Boolean,
     Integer,
+    LargeBinary,
+    TypeDecorator,
+    event,
+    select,
+    text,
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import configure_mappers, declarative_base, deferred, relationship
 from datetime import datetime
+import base64
+import secrets
+
+from db.event_counts import install_event_count_trigger
+from db.partitions import create_event_partitions_after_create
 
 Base = declarative_base()
 
 
+# Server-side equivalent of default=datetime.utcnow for the naive UTC timestamp
+# columns, used where rows are inserted without computing the time in Python
+UTC_NOW = text("(now() AT TIME ZONE 'utc')")
+
+
+class TrackingToken(TypeDecorator):
+    """
+    URL-safe base64 tracking token stored as its raw bytes.
+
+    New tokens are 22 base64 characters (16 bytes); tokens issued before that
+    are 32 characters (24 bytes) and keep working. Keys are compared bytewise.
+    Values that are not valid base64 bind as NULL and therefore match nothing.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Decode a token string to the bytes stored in the column."""
+        if value is None:
+            return None
+        try:
+            # 22-character tokens are sent without their "==" padding
+            return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        except ValueError:
+            return None
+
+    def process_result_value(self, value, dialect):
+        """Encode stored bytes back to the unpadded token string."""
+        if value is None:
+            return None
+        return base64.urlsafe_b64encode(value).decode().rstrip("=")
+
+
+def new_tracking_token():
+    """Return a random 22-character tracking token (16 random bytes)."""
+    return secrets.token_urlsafe(16)
+
+
 class AdminUser(Base):
     __tablename__ = "admin_users"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String(100), unique=True, nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)  # Store bcrypt hash
@@ -38,7 +88,7 @@ class AdminUser(Base):
 class Department(Base):
     __tablename__ = "departments"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -49,9 +99,14 @@ class Department(Base):
 
 class Target(Base):
     __tablename__ = "targets"
+    __table_args__ = (
+        # Case-insensitive "find target by email" (lower(email) = lower(?)),
+        # which the case-sensitive unique index cannot serve
+        Index("ix_targets_lower_email", text("lower(email)")),
+    )
 
     id = Column(BigInteger, primary_key=True)
-    department_id = Column(BigInteger, ForeignKey("departments.id"))
+    department_id = Column(Integer, ForeignKey("departments.id"), index=True)
     email = Column(String(255), nullable=False, unique=True)
     salutation = Column(String(20))  # Mr., Ms., Mrs., Dr., Prof., Mx.
     first_name = Column(String(100))
@@ -70,7 +125,7 @@ class TargetList(Base):
     __tablename__ = "target_lists"
 
     id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"), index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -93,8 +148,9 @@ class TargetListMember(Base):
     )
 
     id = Column(BigInteger, primary_key=True)
+    # Leading column of the unique constraint, which already indexes it
     target_list_id = Column(BigInteger, ForeignKey("target_lists.id"))
-    target_id = Column(BigInteger, ForeignKey("targets.id"))
+    target_id = Column(BigInteger, ForeignKey("targets.id"), index=True)
 
     # Relationships
     target_list = relationship("TargetList", back_populates="target_list_members")
@@ -104,9 +160,11 @@ class TargetListMember(Base):
 class EmailTemplate(Base):
     __tablename__ = "email_templates"
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
-    default_landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"), nullable=True)
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"), index=True)
+    default_landing_page_id = Column(
+        Integer, ForeignKey("landing_pages.id"), nullable=True, index=True
+    )
     name = Column(String(255), nullable=False)
     subject = Column(String(500), nullable=False)
     body_html = Column(Text, nullable=False)
@@ -125,18 +183,21 @@ class EmailTemplate(Base):
 class LandingPage(Base):
     __tablename__ = "landing_pages"
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"), index=True)
     name = Column(String(255), nullable=False)
     url_path = Column(String(255), unique=True, nullable=False)
     # Domain for email links (e.g., phishing.example.com)
     domain = Column(String(255), nullable=False)
 
     # DEPRECATED: Content columns - use template_path instead
-    # These columns are kept for backwards compatibility during migration
-    html_content = Column(Text)  # Now nullable - use template_path for new pages
-    css_content = Column(Text)
-    js_content = Column(Text)
+    # These columns are kept for backwards compatibility during migration.
+    # Deferred as one group: queries skip the (TOASTed) blobs unless a legacy
+    # page actually reads one, which then loads all three together.
+    # html_content is nullable - use template_path for new pages
+    html_content = deferred(Column(Text), group="content")
+    css_content = deferred(Column(Text), group="content")
+    js_content = deferred(Column(Text), group="content")
 
     # NEW: Filesystem path to template directory (e.g., "phish-page", "info_page")
     template_path = Column(String(500))  # Path relative to /templates/landing_pages/
@@ -160,9 +221,9 @@ class ActiveConfiguration(Base):
     __tablename__ = "active_configuration"
 
     id = Column(BigInteger, primary_key=True)  # Always 1 (singleton)
-    active_landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"), nullable=True)
+    active_landing_page_id = Column(Integer, ForeignKey("landing_pages.id"), nullable=True)
     activated_at = Column(DateTime)
-    activated_by_id = Column(BigInteger, ForeignKey("admin_users.id"), nullable=True)
+    activated_by_id = Column(Integer, ForeignKey("admin_users.id"), nullable=True)
     dns_zone_file_path = Column(String(500))
     phishing_domain = Column(String(255))
     public_ip = Column(String(45))  # IPv4/IPv6 for DNS A record
@@ -176,11 +237,22 @@ class ActiveConfiguration(Base):
 
 class Campaign(Base):
     __tablename__ = "campaigns"
+    __table_args__ = (
+        # "Active campaign for this landing page", resolved by the phishing server
+        # on every request (index-only, id is included); also serves
+        # landing_page_id on its own
+        Index(
+            "ix_campaigns_landing_page_id_status",
+            "landing_page_id",
+            "status",
+            postgresql_include=["id"],
+        ),
+    )
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
-    email_template_id = Column(BigInteger, ForeignKey("email_templates.id"))
-    landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"), index=True)
+    email_template_id = Column(Integer, ForeignKey("email_templates.id"), index=True)
+    landing_page_id = Column(Integer, ForeignKey("landing_pages.id"))
     name = Column(String(255), nullable=False)
     description = Column(Text)
     status = Column(
@@ -200,6 +272,8 @@ class Campaign(Base):
     email_template = relationship("EmailTemplate", back_populates="campaigns")
     landing_page = relationship("LandingPage", back_populates="campaigns")
     campaign_target_lists = relationship("CampaignTargetList", back_populates="campaign")
+    # Lazy: the phishing server loads campaigns on hot paths; callers that need
+    # the targets ask for them with selectinload()
     campaign_targets = relationship("CampaignTarget", back_populates="campaign")
 
 
@@ -214,8 +288,9 @@ class CampaignTargetList(Base):
     )
 
     id = Column(BigInteger, primary_key=True)
-    campaign_id = Column(BigInteger, ForeignKey("campaigns.id"))
-    target_list_id = Column(BigInteger, ForeignKey("target_lists.id"))
+    # Leading column of the unique constraint, which already indexes it
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"))
+    target_list_id = Column(BigInteger, ForeignKey("target_lists.id"), index=True)
 
     # Relationships
     campaign = relationship("Campaign", back_populates="campaign_target_lists")
@@ -230,12 +305,20 @@ class CampaignTarget(Base):
             "target_id",
             name="campaign_targets_campaign_id_target_id_key",
         ),
+        # Unsent targets have no token; keep their NULLs out of the unique index
+        Index(
+            "ix_campaign_targets_tracking_token",
+            "tracking_token",
+            unique=True,
+            postgresql_where=text("tracking_token IS NOT NULL"),
+        ),
     )
 
     id = Column(BigInteger, primary_key=True)
-    campaign_id = Column(BigInteger, ForeignKey("campaigns.id"))
-    target_id = Column(BigInteger, ForeignKey("targets.id"))
-    tracking_token = Column(String(255), unique=True)  # Unique token for tracking
+    # Leading column of the unique constraint, which already indexes it
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"))
+    target_id = Column(BigInteger, ForeignKey("targets.id"), index=True)
+    tracking_token = Column(TrackingToken)  # Unique token for tracking
     # Removed email_template_id and landing_page_id - now inherited from campaign
     status = Column(
         String(50), default="pending", nullable=False
@@ -245,16 +328,16 @@ class CampaignTarget(Base):
     # Relationships
     campaign = relationship("Campaign", back_populates="campaign_targets")
     target = relationship("Target", back_populates="campaign_targets")
-    email_jobs = relationship("EmailJob", back_populates="campaign_target")
-    events = relationship("Event", back_populates="campaign_target")
-    form_submissions = relationship("FormSubmission", back_populates="campaign_target")
+    # One-way: jobs, events and submissions are written by id, never through
+    # this collection. Events and submissions are queried directly when needed.
+    email_jobs = relationship("EmailJob", viewonly=True)
 
 
 class EmailJob(Base):
     __tablename__ = "email_jobs"
 
     id = Column(BigInteger, primary_key=True)
-    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
+    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"), index=True)
     celery_task_id = Column(String(255))  # Celery task ID for revocation
     status = Column(
         String(50), default="pending", nullable=False
@@ -266,49 +349,108 @@ class EmailJob(Base):
     retry_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Relationships
-    campaign_target = relationship("CampaignTarget", back_populates="email_jobs")
-
 
 class EventType(Base):
     __tablename__ = "event_types"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     name = Column(
         String(100), unique=True, nullable=False
     )  # e.g., "email_sent", "email_opened", "link_clicked", "form_submitted"
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Relationships
-    events = relationship("Event", back_populates="event_type")
+
+# Event type ids never change once seeded, so each process caches them by name
+EVENT_TYPE_IDS: dict[str, int] = {}
+
+
+def load_event_type_ids(session):
+    """Populate EVENT_TYPE_IDS from the event_types table and return it."""
+    EVENT_TYPE_IDS.update(session.execute(select(EventType.name, EventType.id)).all())
+    return EVENT_TYPE_IDS
+
+
+class UserAgent(Base):
+    """Distinct User-Agent strings referenced by events (db/user_agents.py)."""
+
+    __tablename__ = "user_agents"
+
+    id = Column(BigInteger, primary_key=True)
+    ua_sha256 = Column(LargeBinary(32), unique=True, nullable=False)
+    ua_text = Column(Text, nullable=False)
 
 
 class Event(Base):
     __tablename__ = "events"
+    # Monthly range partitions on created_at; see db/partitions.py
+    __table_args__ = (
+        # "Latest event of a type for a target" lookups; also serves
+        # campaign_target_id alone, so that column has no separate index
+        Index(
+            "ix_events_ct_type_time",
+            "campaign_target_id",
+            "event_type_id",
+            text("created_at DESC"),
+            postgresql_include=["id"],
+        ),
+        # Dashboard time-window scans; rows arrive in created_at order, so a
+        # few block-range summaries per partition stand in for a full B-tree
+        Index("ix_events_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(BigInteger, primary_key=True)
+    # The partition key must be part of the primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
-    event_type_id = Column(BigInteger, ForeignKey("event_types.id"))
+    event_type_id = Column(Integer, ForeignKey("event_types.id"), index=True)
     ip_address = Column(String(45))  # IPv4 or IPv6
-    user_agent = Column(Text)
+    # Dictionary-encoded; see db/user_agents.py
+    user_agent_id = Column(BigInteger, ForeignKey("user_agents.id"))
     browser = Column(String(100))
     os = Column(String(100))
     device_type = Column(String(50))  # mobile, desktop, tablet
     location = Column(String(255))  # Geolocation if available
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Filled by PostgreSQL when omitted; see UTC_NOW
+    created_at = Column(DateTime, server_default=UTC_NOW, primary_key=True)
+
+
+event.listen(Event.__table__, "after_create", create_event_partitions_after_create)
 
-    # Relationships
-    campaign_target = relationship("CampaignTarget", back_populates="events")
-    event_type = relationship("EventType", back_populates="events")
+
+class CampaignEventCount(Base):
+    """Per-campaign event totals, maintained by a trigger on events (db/event_counts.py)."""
+
+    __tablename__ = "campaign_event_counts"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    event_type_id = Column(Integer, ForeignKey("event_types.id"), primary_key=True, index=True)
+    event_count = Column(BigInteger, default=0, nullable=False)  # All events
+    target_count = Column(BigInteger, default=0, nullable=False)  # Distinct campaign targets
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CampaignTargetFirstEvent(Base):
+    """First occurrence of each event type per campaign target (feeds target_count)."""
+
+    __tablename__ = "campaign_target_first_events"
+
+    campaign_target_id = Column(
+        BigInteger, ForeignKey("campaign_targets.id", ondelete="CASCADE"), primary_key=True
+    )
+    event_type_id = Column(Integer, ForeignKey("event_types.id"), primary_key=True, index=True)
+    first_at = Column(DateTime, nullable=False)
+
+
+event.listen(Base.metadata, "after_create", install_event_count_trigger)
 
 
 class FormTemplate(Base):
     __tablename__ = "form_templates"
 
-    id = Column(BigInteger, primary_key=True)
-    landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
+    id = Column(Integer, primary_key=True)
+    landing_page_id = Column(Integer, ForeignKey("landing_pages.id"), index=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"), index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -317,15 +459,15 @@ class FormTemplate(Base):
     # Relationships
     landing_page = relationship("LandingPage", back_populates="form_templates")
     created_by = relationship("AdminUser", back_populates="form_templates")
-    form_questions = relationship("FormQuestion", back_populates="form_template")
+    form_questions = relationship("FormQuestion", back_populates="form_template", lazy="selectin")
     form_submissions = relationship("FormSubmission", back_populates="form_template")
 
 
 class FormQuestion(Base):
     __tablename__ = "form_questions"
 
-    id = Column(BigInteger, primary_key=True)
-    form_template_id = Column(BigInteger, ForeignKey("form_templates.id"))
+    id = Column(Integer, primary_key=True)
+    form_template_id = Column(Integer, ForeignKey("form_templates.id"), index=True)
     question_text = Column(Text, nullable=False)
     question_type = Column(
         String(50), nullable=False
@@ -338,34 +480,54 @@ class FormQuestion(Base):
 
     # Relationships
     form_template = relationship("FormTemplate", back_populates="form_questions")
-    form_answers = relationship("FormAnswer", back_populates="form_question")
 
 
 class FormSubmission(Base):
     __tablename__ = "form_submissions"
 
     id = Column(BigInteger, primary_key=True)
-    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
-    form_template_id = Column(BigInteger, ForeignKey("form_templates.id"))
-    submitted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"), index=True)
+    form_template_id = Column(Integer, ForeignKey("form_templates.id"), index=True)
+    submitted_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
     ip_address = Column(String(45))
     user_agent = Column(Text)
 
     # Relationships
-    campaign_target = relationship("CampaignTarget", back_populates="form_submissions")
     form_template = relationship("FormTemplate", back_populates="form_submissions")
-    form_answers = relationship("FormAnswer", back_populates="form_submission")
+    form_answers = relationship("FormAnswer", back_populates="form_submission", lazy="selectin")
 
 
 class FormAnswer(Base):
     __tablename__ = "form_answers"
 
     id = Column(BigInteger, primary_key=True)
-    form_submission_id = Column(BigInteger, ForeignKey("form_submissions.id"))
-    form_question_id = Column(BigInteger, ForeignKey("form_questions.id"))
+    form_submission_id = Column(BigInteger, ForeignKey("form_submissions.id"), index=True)
+    form_question_id = Column(Integer, ForeignKey("form_questions.id"), index=True)
+    # Copy of form_questions.question_text so reports render without the join
+    question_text = Column(Text)
     answer_text = Column(Text)  # Store all answer types as text (JSON if needed)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Relationships
+    # Relationships (no form_question: read question_text, or join on form_question_id)
     form_submission = relationship("FormSubmission", back_populates="form_answers")
-    form_question = relationship("FormQuestion", back_populates="form_answers")
+
+    @classmethod
+    def for_question(cls, question, answer_text, **kwargs):
+        """
+        Build an answer to a FormQuestion, copying its question_text.
+
+        Pass questions from the already-loaded FormTemplate.form_questions
+        (selectin), so no query is issued per answer. Core and bulk inserts
+        must set question_text themselves.
+        """
+        return cls(
+            form_question_id=question.id,
+            question_text=question.question_text,
+            answer_text=answer_text,
+            **kwargs,
+        )
+
+
+# Resolve every relationship at import time, before gunicorn workers take
+# requests, instead of on the first query in each process
+configure_mappers()
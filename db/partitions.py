@@ -0,0 +1,112 @@
+"""
+Monthly range partitions for the events table.
+
+events is partitioned by RANGE (created_at) with one child table per calendar
+month (events_y2026m01, ...) plus events_default for rows outside them. Child
+tables must exist before rows for their month arrive, so they are created a
+few months ahead (webadmin re-checks daily, see
+webadmin/utils/partition_maintenance.py). A month created late has its rows
+moved out of events_default.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+EVENTS_TABLE = "events"
+DEFAULT_MONTHS_AHEAD = 3
+
+# Serializes partition maintenance between processes (pg_advisory_xact_lock key)
+PARTITION_LOCK_KEY = 0x6576656E7473  # "events"
+
+
+def _add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start, table=EVENTS_TABLE):
+    """Return the child table name for the month starting at month_start."""
+    return f"{table}_y{month_start.year:04d}m{month_start.month:02d}"
+
+
+def create_month_partition(connection, month_start, table=EVENTS_TABLE):
+    """
+    Create the partition holding the month that starts at month_start.
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows for its range. In that case the default is detached, the
+    month created, its rows moved over and the default reattached, all in
+    the caller's transaction (which holds an ACCESS EXCLUSIVE lock on the
+    table meanwhile).
+
+    Args:
+        connection: SQLAlchemy connection (PostgreSQL)
+        month_start: First day of the month
+        table: Partitioned parent table
+
+    Returns:
+        str: Name of the partition
+    """
+    name = partition_name(month_start, table)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return name
+
+    default = f"{table}_default"
+    bounds = {"start": month_start, "end": _add_months(month_start, 1)}
+    in_month = "created_at >= :start AND created_at < :end"
+    create = (
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') "
+        f"TO ('{bounds['end'].isoformat()}')"
+    )
+
+    stranded = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})"), bounds
+    ).scalar()
+    if not stranded:
+        connection.execute(text(create))
+        return name
+
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(create))
+    # Inserted into the child directly, so the statement-level counting
+    # trigger on events (db/event_counts.py) doesn't count these rows twice
+    connection.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"), bounds)
+    connection.execute(text(f"DELETE FROM {default} WHERE {in_month}"), bounds)
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    return name
+
+
+def ensure_event_partitions(connection, months_ahead=DEFAULT_MONTHS_AHEAD, today=None):
+    """
+    Make sure partitions exist from the current month through months_ahead.
+
+    Args:
+        connection: SQLAlchemy connection (PostgreSQL)
+        months_ahead: Number of future months to create
+        today: Reference date (defaults to the current UTC date)
+
+    Returns:
+        list: Names of the partitions checked or created
+    """
+    today = today or datetime.utcnow().date()
+    current = date(today.year, today.month, 1)
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+    return [
+        create_month_partition(connection, _add_months(current, offset))
+        for offset in range(months_ahead + 1)
+    ]
+
+
+def create_event_partitions_after_create(target, connection, **kw):
+    """after_create hook so metadata.create_all() yields a usable events table."""
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {EVENTS_TABLE}_default "
+            f"PARTITION OF {EVENTS_TABLE} DEFAULT"
+        )
+    )
+    ensure_event_partitions(connection)
@@ -1,5 +1,6 @@
+from functools import cache
 from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 
 class AdminUserDTO(BaseModel):
@@ -110,3 +111,28 @@ class FormAnswerDTO(BaseModel):
     id: int
     form_submission_id: Optional[int] = None
     form_question_id: Optional[int] = None
+    question_text: Optional[str] = None
+    answer_text: Optional[str] = None
+
+
+@cache
+def list_adapter(dto):
+    """Return the shared TypeAdapter for list[dto], built once per DTO class."""
+    return TypeAdapter(list[dto])
+
+
+def dump_rows(dto, rows):
+    """Validate ORM objects or mappings as a list of dto and dump them to JSON-safe dicts."""
+    adapter = list_adapter(dto)
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+
+
+def construct_rows(dto, rows):
+    """
+    Build DTOs from trusted mappings without validation.
+
+    For rows just read from the database (e.g. ``result.mappings()``), whose
+    types the schema already guarantees; anything else goes through
+    model_validate().
+    """
+    return [dto.model_construct(**row) for row in rows]
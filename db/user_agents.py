@@ -0,0 +1,138 @@
+"""
+Dictionary-encoded user agent strings for the events table.
+
+Events store a user_agent_id into user_agents instead of the raw header. A
+campaign sees a few hundred distinct user agents across millions of events,
+so each string is stored once and the events heap carries an 8-byte key.
+
+Rows are keyed by the SHA-256 of the string and never change once inserted,
+so each process keeps a bounded string -> id map in front of the table.
+
+parse_user_agent() derives the browser, OS and device type stored alongside.
+"""
+
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import UserAgent
+
+USER_AGENT_CACHE_SIZE = 1024
+
+_ids: "OrderedDict[str, int]" = OrderedDict()
+_ids_lock = threading.Lock()
+
+
+def user_agent_hash(user_agent):
+    """Return the SHA-256 digest that keys a user agent string."""
+    return hashlib.sha256(user_agent.encode("utf-8")).digest()
+
+
+def get_user_agent_id(session, user_agent):
+    """
+    Return the user_agents id for a user agent string, inserting it if new.
+
+    Args:
+        session: Active SQLAlchemy session
+        user_agent: Raw User-Agent header value
+
+    Returns:
+        int: user_agents.id, or None for a missing/empty user agent
+    """
+    if not user_agent:
+        return None
+
+    with _ids_lock:
+        user_agent_id = _ids.get(user_agent)
+        if user_agent_id is not None:
+            _ids.move_to_end(user_agent)
+            return user_agent_id
+
+    digest = user_agent_hash(user_agent)
+    user_agent_id = session.execute(
+        insert(UserAgent)
+        .values(ua_sha256=digest, ua_text=user_agent)
+        .on_conflict_do_nothing(index_elements=["ua_sha256"])
+        .returning(UserAgent.id)
+    ).scalar()
+    if user_agent_id is None:
+        # Already present, e.g. inserted by another worker. Rows this
+        # transaction inserts are cached only once a later lookup lands here
+        user_agent_id = session.execute(
+            select(UserAgent.id).where(UserAgent.ua_sha256 == digest)
+        ).scalar_one()
+        with _ids_lock:
+            _ids[user_agent] = user_agent_id
+            while len(_ids) > USER_AGENT_CACHE_SIZE:
+                _ids.popitem(last=False)
+    return user_agent_id
+
+
+# Every keyword the classification below looks at, found in one scan. The
+# lookahead reports overlapping matches too, so the result is exactly the
+# set of keywords contained in the (case-folded) user agent
+_UA_KEYWORDS = re.compile(
+    r"(?=(chrome|edg|firefox|safari|msie|trident|windows|mac os|macintosh|linux"
+    r"|android|iphone|ipad|mobile|tablet))",
+    re.IGNORECASE,
+)
+
+
+class UAInfo(NamedTuple):
+    """Browser, OS and device type parsed from a user agent (shared, immutable)."""
+
+    browser: str
+    os: str
+    device_type: str
+
+
+@functools.lru_cache(maxsize=10000)
+def parse_user_agent(user_agent_str: str) -> UAInfo:
+    """
+    Parse user agent string to extract browser, OS, and device type.
+
+    A few user agents make up most traffic, so results are memoized; the
+    returned tuple is shared between callers.
+    """
+    found = {keyword.lower() for keyword in _UA_KEYWORDS.findall(user_agent_str or "")}
+
+    # Simple browser detection
+    browser = "unknown"
+    if "chrome" in found and "edg" not in found:
+        browser = "Chrome"
+    elif "firefox" in found:
+        browser = "Firefox"
+    elif "safari" in found and "chrome" not in found:
+        browser = "Safari"
+    elif "edg" in found:
+        browser = "Edge"
+    elif "msie" in found or "trident" in found:
+        browser = "Internet Explorer"
+
+    # Simple OS detection
+    os_name = "unknown"
+    if "windows" in found:
+        os_name = "Windows"
+    elif "mac os" in found or "macintosh" in found:
+        os_name = "macOS"
+    elif "linux" in found:
+        os_name = "Linux"
+    elif "android" in found:
+        os_name = "Android"
+    elif "iphone" in found or "ipad" in found:
+        os_name = "iOS"
+
+    # Simple device type detection
+    device_type = "desktop"
+    if "mobile" in found or "android" in found or "iphone" in found:
+        device_type = "mobile"
+    elif "ipad" in found or "tablet" in found:
+        device_type = "tablet"
+
+    return UAInfo(browser, os_name, device_type)
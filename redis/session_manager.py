@@ -6,7 +6,7 @@ This script provides utilities for managing Flask sessions stored in Redis.
 Sessions are stored in DB 0 with the following structure:
 
 Session Key Format: session:<session_id>
-Session Data Structure (Hash):
+Session Data Structure (JSON-encoded string, written with SET ... EX):
     - user_id: Admin user ID from database
     - role: User role (e.g., "admin")
     - created_at: ISO 8601 timestamp
@@ -17,14 +17,51 @@ Session Data Structure (Hash):
     - mfa_verified: MFA verification status (0 or 1)
 
 Default Session TTL: 1800 seconds (30 minutes)
+
+User Index Key Format: user_sessions:<user_id>
+User Index Structure (Set): IDs of that user's sessions, expiring no earlier
+than the longest-lived of them. Members of expired sessions are purged by
+reconcile_user_index().
+
+Statistics Keys (Sorted Sets, scored by expiry as a Unix timestamp):
+    - sessions:by_expiry: session IDs
+    - users:by_expiry: user IDs, scored by their latest session expiry
+Entries past their score are trimmed when read, so get_stats never scans.
 """
 
 import redis
 import sys
 import json
+import time
 from datetime import datetime
 from typing import Optional, Dict, List
 
+USER_SESSIONS_KEY = "user_sessions:{user_id}"
+SESSIONS_BY_EXPIRY_KEY = "sessions:by_expiry"
+USERS_BY_EXPIRY_KEY = "users:by_expiry"
+
+# Deletes a session and updates its user index and statistics in one atomic
+# round trip; the user ID is only known after reading the session.
+# KEYS: session key, sessions:by_expiry, users:by_expiry  ARGV: session ID
+DELETE_SESSION_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+if not raw then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+local user_id = cjson.decode(raw)['user_id']
+if user_id ~= nil and user_id ~= cjson.null then
+    user_id = tostring(user_id)
+    local index_key = 'user_sessions:' .. user_id
+    redis.call('SREM', index_key, ARGV[1])
+    if redis.call('SCARD', index_key) == 0 then
+        redis.call('ZREM', KEYS[3], user_id)
+    end
+end
+return 1
+"""
+
 
 class SessionManager:
     """Manage Redis sessions for Phishly webadmin."""
@@ -40,6 +77,8 @@ class SessionManager:
         """
         self.redis = redis.Redis(host=host, port=port, db=db, decode_responses=True)
         self.default_ttl = 1800  # 30 minutes
+        # Sent by SHA (EVALSHA), loading the script only on first use
+        self._delete_script = self.redis.register_script(DELETE_SESSION_SCRIPT)
 
     def get_session(self, session_id: str) -> Optional[Dict]:
         """
@@ -51,36 +90,112 @@ class SessionManager:
         Returns:
             Dictionary of session data or None if not found
         """
-        key = f"session:{session_id}"
-        session_data = self.redis.hgetall(key)
+        sessions = self._read_sessions([f"session:{session_id}"])
+        return sessions[0] if sessions else None
 
-        if not session_data:
-            return None
+    def _read_sessions(self, keys: List[str]) -> List[Dict]:
+        """
+        Read session values and their TTLs in a single round trip.
 
-        # Get TTL
-        ttl = self.redis.ttl(key)
-        session_data["ttl"] = ttl
-        session_data["session_id"] = session_id
+        Args:
+            keys: Session keys (session:<session_id>)
 
-        return session_data
+        Returns:
+            List of session dictionaries; keys that no longer exist are skipped
+        """
+        if not keys:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+
+        sessions = []
+        for key, raw, ttl in zip(keys, results[::2], results[1::2]):
+            if not raw:
+                continue
+            session_data = json.loads(raw)
+            session_data["ttl"] = ttl
+            session_data["session_id"] = key.split(":", 1)[1]
+            sessions.append(session_data)
+        return sessions
 
-    def list_sessions(self, pattern: str = "session:*") -> List[Dict]:
+    def list_sessions(self, pattern: str = "session:*", batch_size: int = 500) -> List[Dict]:
         """
         List all sessions matching pattern.
 
+        Each SCAN batch is read with one pipelined round trip instead of two
+        commands per session.
+
         Args:
             pattern: Redis key pattern (default: session:*)
+            batch_size: SCAN COUNT hint, i.e. roughly the keys read per round trip
 
         Returns:
             List of session dictionaries
         """
         sessions = []
-        for key in self.redis.scan_iter(pattern):
-            session_id = key.replace("session:", "")
-            session = self.get_session(session_id)
-            if session:
-                sessions.append(session)
-        return sessions
+        cursor = 0
+        while True:
+            cursor, keys = self.redis.scan(cursor, match=pattern, count=batch_size)
+            sessions.extend(self._read_sessions(keys))
+            if cursor == 0:
+                return sessions
+
+    def create_session(self, session_id: str, data: Dict, ttl: Optional[int] = None) -> None:
+        """
+        Write a session with its TTL, user index entry and stats atomically.
+
+        Args:
+            session_id: Session identifier
+            data: Session fields (see module docstring)
+            ttl: TTL in seconds (default: 1800)
+        """
+        key = f"session:{session_id}"
+        ttl = ttl or self.default_ttl
+        user_id = data.get("user_id")
+
+        pipe = self.redis.pipeline()
+        # One string value: SET carries the TTL, and readers parse it in one GET
+        pipe.set(key, json.dumps(data), ex=ttl)
+        if user_id is not None:
+            self._index_session(pipe, session_id, user_id, ttl)
+        self._track_expiry(pipe, session_id, user_id, ttl)
+        pipe.execute()
+
+    def _index_session(self, pipe, session_id: str, user_id, ttl: int) -> None:
+        """
+        Queue the user index update for a session on a pipeline.
+
+        Args:
+            pipe: Redis pipeline the session write is queued on
+            session_id: Session identifier
+            user_id: Admin user ID
+            ttl: Session TTL in seconds
+        """
+        index_key = USER_SESSIONS_KEY.format(user_id=user_id)
+        pipe.sadd(index_key, session_id)
+        # Keep the index alive as long as its longest-lived session
+        pipe.expire(index_key, ttl, nx=True)
+        pipe.expire(index_key, ttl, gt=True)
+
+    def _track_expiry(self, pipe, session_id: str, user_id, ttl: int) -> None:
+        """
+        Queue the statistics sorted-set updates for a session on a pipeline.
+
+        Args:
+            pipe: Redis pipeline the session write is queued on
+            session_id: Session identifier
+            user_id: Admin user ID (only the session is tracked if None)
+            ttl: Session TTL in seconds
+        """
+        expires_at = time.time() + ttl
+        pipe.zadd(SESSIONS_BY_EXPIRY_KEY, {session_id: expires_at})
+        if user_id is not None:
+            # GT: a shorter-lived session never pulls the user's expiry back
+            pipe.zadd(USERS_BY_EXPIRY_KEY, {str(user_id): expires_at}, gt=True)
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -92,9 +207,11 @@ class SessionManager:
         Returns:
             True if deleted, False if not found
         """
-        key = f"session:{session_id}"
-        result = self.redis.delete(key)
-        return result > 0
+        deleted = self._delete_script(
+            keys=[f"session:{session_id}", SESSIONS_BY_EXPIRY_KEY, USERS_BY_EXPIRY_KEY],
+            args=[session_id],
+        )
+        return deleted == 1
 
     def extend_session(self, session_id: str, ttl: Optional[int] = None) -> bool:
         """
@@ -108,13 +225,29 @@ class SessionManager:
             True if extended, False if session not found
         """
         key = f"session:{session_id}"
-        if not self.redis.exists(key):
+        ttl = ttl or self.default_ttl
+
+        # GETEX resets the TTL and returns the value in one command
+        raw = self.redis.getex(key, ex=ttl)
+        if raw is None:
             return False
+        user_id = self._user_id(raw)
 
-        ttl = ttl or self.default_ttl
-        self.redis.expire(key, ttl)
+        pipe = self.redis.pipeline(transaction=False)
+        if user_id is not None:
+            pipe.expire(USER_SESSIONS_KEY.format(user_id=user_id), ttl, gt=True)
+        self._track_expiry(pipe, session_id, user_id, ttl)
+        pipe.execute()
         return True
 
+    @staticmethod
+    def _user_id(raw: Optional[str]):
+        """Return the user_id stored in a raw session value, or None."""
+        if not raw:
+            return None
+        user_id = json.loads(raw).get("user_id")
+        return None if user_id is None else str(user_id)
+
     def get_user_sessions(self, user_id: int) -> List[Dict]:
         """
         Get all sessions for a specific user.
@@ -125,44 +258,95 @@ class SessionManager:
         Returns:
             List of session dictionaries for this user
         """
-        all_sessions = self.list_sessions()
-        return [s for s in all_sessions if s.get("user_id") == str(user_id)]
+        session_ids = self.redis.smembers(USER_SESSIONS_KEY.format(user_id=user_id))
+        return self._read_sessions([f"session:{session_id}" for session_id in session_ids])
 
-    def cleanup_expired(self) -> int:
+    def reconcile_user_index(self) -> Dict:
         """
-        Clean up expired sessions (Redis handles this automatically).
+        Bring the user index and statistics sets back in line with the sessions.
 
-        This method scans for sessions with TTL < 0.
+        Adds sessions written without an index entry and removes members whose
+        session has expired. Meant to run periodically (see the ``reconcile``
+        command), not per request.
 
         Returns:
-            Number of sessions cleaned up
+            Dictionary with the number of index members added and removed
         """
-        count = 0
-        for key in self.redis.scan_iter("session:*"):
-            ttl = self.redis.ttl(key)
-            if ttl < 0:  # No expiration set or expired
-                self.redis.delete(key)
-                count += 1
-        return count
+        sessions = self.list_sessions()
+
+        # Count index members that were missing, then refresh index and stats
+        # entries (SADD again is a no-op) with each session's remaining TTL
+        pipe = self.redis.pipeline(transaction=False)
+        for session in sessions:
+            if session.get("user_id"):
+                index_key = USER_SESSIONS_KEY.format(user_id=session["user_id"])
+                pipe.sadd(index_key, session["session_id"])
+        added = sum(pipe.execute())
+
+        pipe = self.redis.pipeline(transaction=False)
+        for session in sessions:
+            ttl = session["ttl"] if session["ttl"] > 0 else self.default_ttl
+            if session.get("user_id"):
+                self._index_session(pipe, session["session_id"], session["user_id"], ttl)
+            self._track_expiry(pipe, session["session_id"], session.get("user_id"), ttl)
+        pipe.execute()
+
+        removed = 0
+        for index_key in self.redis.scan_iter(USER_SESSIONS_KEY.format(user_id="*")):
+            session_ids = list(self.redis.sscan_iter(index_key))
+            pipe = self.redis.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.exists(f"session:{session_id}")
+            dangling = [sid for sid, exists in zip(session_ids, pipe.execute()) if not exists]
+            if dangling:
+                removed += self.redis.srem(index_key, *dangling)
+
+        return {"added": added, "removed": removed}
+
+    def sampled_missing_ttl(self, sample_size: int = 100) -> List[str]:
+        """
+        Report sampled session keys that were written without a TTL.
+
+        Redis expires sessions on its own, so nothing is swept here. A key with
+        TTL -1 means a writer skipped EXPIRE (create_session never does), which
+        is a bug to fix at the write site. Only one SCAN page is checked.
+
+        Args:
+            sample_size: SCAN COUNT hint for the sample
+
+        Returns:
+            List of session keys without an expiration
+        """
+        _, keys = self.redis.scan(0, match="session:*", count=sample_size)
+        if not keys:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        return [key for key, ttl in zip(keys, pipe.execute()) if ttl == -1]
 
     def get_stats(self) -> Dict:
         """
         Get session statistics.
 
+        Reads the expiry-scored sorted sets instead of listing every session.
+
         Returns:
             Dictionary with session statistics
         """
-        sessions = self.list_sessions()
-
-        # Count active users
-        active_users = set()
-        for session in sessions:
-            if session.get("user_id"):
-                active_users.add(session["user_id"])
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(SESSIONS_BY_EXPIRY_KEY, "-inf", now)
+        pipe.zremrangebyscore(USERS_BY_EXPIRY_KEY, "-inf", now)
+        pipe.zcard(SESSIONS_BY_EXPIRY_KEY)
+        pipe.zcard(USERS_BY_EXPIRY_KEY)
+        _, _, total_sessions, active_users = pipe.execute()
 
         return {
-            "total_sessions": len(sessions),
-            "active_users": len(active_users),
+            "total_sessions": total_sessions,
+            "active_users": active_users,
+            "memory_used": self.redis.info("memory").get("used_memory_human"),
             "database": 0,
             "timestamp": datetime.utcnow().isoformat(),
         }
@@ -198,8 +382,12 @@ def main():
     # Stats command
     subparsers.add_parser("stats", help="Show session statistics")
 
-    # Cleanup command
-    subparsers.add_parser("cleanup", help="Clean up expired sessions")
+    # TTL check command
+    check_parser = subparsers.add_parser("check-ttl", help="Sample sessions written without a TTL")
+    check_parser.add_argument("--sample", type=int, default=100, help="Number of keys to sample")
+
+    # Reconcile command
+    subparsers.add_parser("reconcile", help="Repair the per-user session index")
 
     args = parser.parse_args()
 
@@ -243,9 +431,13 @@ def main():
             stats = manager.get_stats()
             print(json.dumps(stats, indent=2))
 
-        elif args.command == "cleanup":
-            count = manager.cleanup_expired()
-            print(f"Cleaned up {count} expired sessions")
+        elif args.command == "check-ttl":
+            keys = manager.sampled_missing_ttl(args.sample)
+            print(json.dumps({"sampled": args.sample, "missing_ttl": keys}, indent=2))
+
+        elif args.command == "reconcile":
+            result = manager.reconcile_user_index()
+            print(json.dumps(result, indent=2))
 
     except redis.ConnectionError:
         print(f"Error: Could not connect to Redis at {args.host}:{args.port}", file=sys.stderr)
@@ -1,164 +1,94 @@
 """
-Database models and connection management for Phishly Phishing Server.
+Database connection management for Phishly Phishing Server.
 
-This module provides SQLAlchemy models and query functions for:
+Models come from the shared db.models package. This module provides query
+functions for:
 - Looking up campaign targets by tracking token
 - Fetching landing page content
 - Logging tracking events (link clicks, form submissions)
 """
 
 import os
+import sys
 import json
+import atexit
 import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
 from contextlib import contextmanager
 
-from sqlalchemy import (
-    create_engine,
-    Column,
-    BigInteger,
-    String,
-    Text,
-    DateTime,
-    ForeignKey,
-    Integer,
-    Boolean,
-    text,
-)
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy import Row, String, bindparam, case, create_engine, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 
-logger = logging.getLogger(__name__)
+# Add parent directory to path to import the shared db package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.active_config import ActiveConfigCache  # noqa: E402
+from db.bulk import bulk_insert  # noqa: E402
+from db.pg_copy import copy_rows  # noqa: E402
+from db.user_agents import get_user_agent_id, parse_user_agent  # noqa: E402
+
+# Shared models, also re-exported for server.py; the phishing server used to
+# declare its own subset, which drifted from the real schema
+from db.models import (  # noqa: E402, F401
+    EVENT_TYPE_IDS,
+    ActiveConfiguration,
+    Campaign,
+    CampaignTarget,
+    Event,
+    EventType,
+    FormSubmission,
+    LandingPage,
+    Target,
+    TrackingToken,
+    load_event_type_ids,
+)
 
-Base = declarative_base()
+logger = logging.getLogger(__name__)
 
 
 # ============================================
-# Database Models (subset needed for phishing server)
+# Database Connection
 # ============================================
 
 
-class Target(Base):
-    """Target employees who receive phishing emails."""
-
-    __tablename__ = "targets"
-
-    id = Column(BigInteger, primary_key=True)
-    email = Column(String(255))
-    first_name = Column(String(100))
-    last_name = Column(String(100))
-
-
-class Campaign(Base):
-    """Phishing campaigns."""
-
-    __tablename__ = "campaigns"
-
-    id = Column(BigInteger, primary_key=True)
-    name = Column(String(255))
-    landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
-    status = Column(String(50))
-
-    landing_page = relationship("LandingPage")
-
-
-class CampaignTarget(Base):
-    """Individual campaign-target assignments with tracking."""
-
-    __tablename__ = "campaign_targets"
-
-    id = Column(BigInteger, primary_key=True)
-    campaign_id = Column(BigInteger, ForeignKey("campaigns.id"))
-    target_id = Column(BigInteger, ForeignKey("targets.id"))
-    tracking_token = Column(String(255), unique=True)
-    status = Column(String(50))
-
-    campaign = relationship("Campaign")
-    target = relationship("Target")
-
-
-class LandingPage(Base):
-    """Landing pages shown after clicking phishing link."""
-
-    __tablename__ = "landing_pages"
+# libpq TCP keepalives so a dead peer is noticed in ~1 minute, not the kernel's hours
+TCP_KEEPALIVE_ARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
 
-    id = Column(BigInteger, primary_key=True)
-    name = Column(String(255))
-    url_path = Column(String(255), unique=True)
-    html_content = Column(Text)
-    css_content = Column(Text)
-    js_content = Column(Text)
-    capture_credentials = Column(Boolean, default=False)
-    capture_form_data = Column(Boolean, default=True)
-    redirect_url = Column(String(500))
 
+# Cap each statement so a stuck query fails the request instead of holding a
+# worker and a pooled connection
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
 
-class EventType(Base):
-    """Types of tracking events."""
+# Per-process pool; with gevent workers many requests share it, so size it to
+# what PostgreSQL can serve (max_connections / processes), not to concurrency
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
 
-    __tablename__ = "event_types"
+# Seconds a request waits for a pooled connection before failing, instead of
+# SQLAlchemy's 30 s default that lets a saturated pool back up every worker thread
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
 
-    id = Column(BigInteger, primary_key=True)
-    name = Column(String(100), unique=True)
-    description = Column(Text)
+# Ping each connection on checkout (one extra round trip per request). TCP
+# keepalives and pool_recycle already retire dead connections, so this can be
+# turned off where the database is never restarted under a running server
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
 
-
-class Event(Base):
-    """Tracking events for campaign interactions."""
-
-    __tablename__ = "events"
-
-    id = Column(BigInteger, primary_key=True)
-    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
-    event_type_id = Column(BigInteger, ForeignKey("event_types.id"))
-    ip_address = Column(String(45))
-    user_agent = Column(Text)
-    browser = Column(String(100))
-    os = Column(String(100))
-    device_type = Column(String(50))
-    location = Column(String(255))
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-    campaign_target = relationship("CampaignTarget")
-    event_type = relationship("EventType")
-
-
-class FormSubmission(Base):
-    """Form submissions from landing pages."""
-
-    __tablename__ = "form_submissions"
-
-    id = Column(BigInteger, primary_key=True)
-    campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
-    form_template_id = Column(BigInteger)
-    submitted_at = Column(DateTime, default=datetime.utcnow)
-    ip_address = Column(String(45))
-    user_agent = Column(Text)
-
-    campaign_target = relationship("CampaignTarget")
-
-
-class ActiveConfiguration(Base):
-    """Singleton table for active landing page configuration."""
-
-    __tablename__ = "active_configuration"
-
-    id = Column(BigInteger, primary_key=True)
-    active_landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
-    phishing_domain = Column(String(255))
-    public_ip = Column(String(45))
-    activated_at = Column(DateTime)
-    activated_by_id = Column(BigInteger)
-    dns_zone_file_path = Column(String(500))
-
-    active_landing_page = relationship("LandingPage")
-
-
-# ============================================
-# Database Connection
-# ============================================
+# A connection test result is reused for this many seconds, so a burst of
+# health probes costs one round trip, and probes against a down database
+# don't each wait out a connect timeout
+HEALTH_CHECK_TTL = float(os.getenv("DB_HEALTH_CHECK_TTL", "5"))
 
 
 class DatabaseManager:
@@ -173,46 +103,73 @@ class DatabaseManager:
         self.password = os.getenv("POSTGRES_PASSWORD", "")
 
         self.connection_string = (
-            f"postgresql://{self.user}:{self.password}@"
+            f"postgresql+psycopg://{self.user}:{self.password}@"
             f"{self.host}:{self.port}/{self.database}"
         )
 
         self.engine = create_engine(
             self.connection_string,
             poolclass=QueuePool,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
-            pool_recycle=3600,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            # Reuse the most recently returned connection: a few stay warm and
+            # idle overflow connections age out instead of rotating
+            pool_use_lifo=True,
+            pool_pre_ping=POOL_PRE_PING,
+            pool_recycle=1800,
+            connect_args={
+                **TCP_KEEPALIVE_ARGS,
+                "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+            },
+            insertmanyvalues_page_size=1000,
             echo=False,
         )
 
         self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
-        logger.info(f"Database initialized: {self.host}:{self.port}/{self.database}")
+        self._health: Optional[Tuple[float, bool]] = None
+        logger.info(
+            "Database initialized: %s:%s/%s (pool_size=%d, max_overflow=%d, pre_ping=%s)",
+            self.host, self.port, self.database, POOL_SIZE, MAX_OVERFLOW, POOL_PRE_PING,
+        )
 
     @contextmanager
     def get_session(self):
-        """Context manager for database sessions."""
+        """
+        Context manager for database sessions.
+
+        Every session is closed on exit, returning its connection to the pool
+        right away; nested contexts get independent sessions.
+        """
         session = self.SessionLocal()
         try:
             yield session
             session.commit()
         except Exception as e:
             session.rollback()
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
         finally:
             session.close()
 
+    def pool_status(self) -> str:
+        """Return the connection pool's checked-in/checked-out/overflow summary."""
+        return self.engine.pool.status()
+
     def test_connection(self) -> bool:
-        """Test database connection."""
+        """Test database connection; the result is cached for HEALTH_CHECK_TTL seconds."""
+        health = self._health
+        if health is not None and time.monotonic() - health[0] < HEALTH_CHECK_TTL:
+            return health[1]
         try:
-            with self.get_session() as session:
-                session.execute(text("SELECT 1"))
-            return True
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
         except Exception as e:
-            logger.error(f"Database connection test failed: {e}")
-            return False
+            logger.error("Database connection test failed: %s", e)
+            healthy = False
+        self._health = (time.monotonic(), healthy)
+        return healthy
 
 
 # ============================================
@@ -220,24 +177,75 @@ class DatabaseManager:
 # ============================================
 
 
+# Built once at import: every click runs one of these, and reusing the same
+# statement objects with a bound token keeps the compiled-SQL cache lookup cheap.
+# They select plain columns; the handlers never need an identity-mapped object
+_TARGET_BY_TOKEN = select(CampaignTarget.id, CampaignTarget.target_id).where(
+    CampaignTarget.tracking_token == bindparam("tracking_token")
+)
+_TARGET_BY_TOKEN_WITH_LANDING_PAGE = (
+    _TARGET_BY_TOKEN.add_columns(LandingPage.redirect_url)
+    .outerjoin(Campaign, Campaign.id == CampaignTarget.campaign_id)
+    .outerjoin(LandingPage, LandingPage.id == Campaign.landing_page_id)
+)
+
+
+# A target's token never changes and one recipient hits it several times within
+# seconds (open pixel, click, assets, submit), so lookups are cached per
+# process; unknown tokens too, which also absorbs scanners replaying a URL
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "50000"))
+
+_campaign_targets_by_token: "OrderedDict[Tuple[str, bool], Tuple[float, Optional[Row]]]" = (
+    OrderedDict()
+)
+_campaign_targets_by_token_lock = threading.Lock()
+
+
 def get_campaign_target_by_token(
-    session: Session, tracking_token: str
-) -> Optional[CampaignTarget]:
+    session: Session, tracking_token: str, with_landing_page: bool = False
+) -> Optional[Row]:
     """
-    Look up campaign target by tracking token.
+    Look up campaign target by tracking token, cached in-process.
 
     Args:
-        session: SQLAlchemy session
+        session: SQLAlchemy session used on a cache miss
         tracking_token: The tracking token from the URL
+        with_landing_page: Also return the landing page's redirect_url
 
     Returns:
-        CampaignTarget object or None if not found
+        Row with id and target_id (plus redirect_url), or None if not found
     """
-    return (
-        session.query(CampaignTarget)
-        .filter(CampaignTarget.tracking_token == tracking_token)
-        .first()
-    )
+    key = (tracking_token, with_landing_page)
+    now = time.monotonic()
+    with _campaign_targets_by_token_lock:
+        entry = _campaign_targets_by_token.get(key)
+        if entry is not None and now - entry[0] < TOKEN_CACHE_TTL:
+            _campaign_targets_by_token.move_to_end(key)
+            return entry[1]
+
+    statement = _TARGET_BY_TOKEN_WITH_LANDING_PAGE if with_landing_page else _TARGET_BY_TOKEN
+    campaign_target = session.execute(statement, {"tracking_token": tracking_token}).first()
+
+    with _campaign_targets_by_token_lock:
+        _campaign_targets_by_token[key] = (now, campaign_target)
+        _campaign_targets_by_token.move_to_end(key)
+        while len(_campaign_targets_by_token) > TOKEN_CACHE_SIZE:
+            _campaign_targets_by_token.popitem(last=False)
+    return campaign_target
+
+
+# Pages may be stored with or without a leading slash; one statement matches
+# both and prefers the exact path, instead of a second query on a miss
+_url_path = bindparam("url_path", type_=String)
+_URL_PATH_MATCH = LandingPage.url_path.in_([_url_path, "/" + _url_path])
+_URL_PATH_ORDER = case((LandingPage.url_path == _url_path, 0), else_=1)
+_LANDING_PAGE_BY_URL_PATH = (
+    select(LandingPage).where(_URL_PATH_MATCH).order_by(_URL_PATH_ORDER).limit(1)
+)
+_LANDING_PAGE_HTML_BY_URL_PATH = (
+    select(LandingPage.html_content).where(_URL_PATH_MATCH).order_by(_URL_PATH_ORDER).limit(1)
+)
 
 
 def get_landing_page_by_url_path(
@@ -255,46 +263,98 @@ def get_landing_page_by_url_path(
     """
     # Normalize path - remove leading/trailing slashes
     normalized_path = url_path.strip("/")
+    return session.execute(
+        _LANDING_PAGE_BY_URL_PATH, {"url_path": normalized_path}
+    ).scalar_one_or_none()
 
-    # Try exact match first
-    landing_page = (
-        session.query(LandingPage)
-        .filter(LandingPage.url_path == normalized_path)
-        .first()
-    )
 
-    if not landing_page:
-        # Try with leading slash
-        landing_page = (
-            session.query(LandingPage)
-            .filter(LandingPage.url_path == f"/{normalized_path}")
-            .first()
-        )
+# Landing page HTML by normalized url_path for the database fallback route,
+# including misses so probes for unknown paths don't query twice. Pages are
+# edited from webadmin's process, so entries expire rather than being
+# invalidated
+LANDING_PAGE_CACHE_TTL = int(os.getenv("LANDING_PAGE_CACHE_TTL", "60"))
+LANDING_PAGE_CACHE_SIZE = 256
 
-    return landing_page
+_landing_page_html: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+_landing_page_html_lock = threading.Lock()
 
 
-def get_or_create_event_type(session: Session, event_name: str) -> EventType:
+def get_landing_page_html(session: Session, url_path: str) -> Optional[str]:
     """
-    Get or create an event type by name.
+    Get a landing page's HTML by URL path, cached in-process.
 
     Args:
-        session: SQLAlchemy session
-        event_name: Event type name (e.g., "link_clicked")
+        session: SQLAlchemy session used on a cache miss
+        url_path: The URL path (e.g., "login-portal")
 
     Returns:
-        EventType object
+        HTML content or None if no landing page matches
     """
-    event_type = (
-        session.query(EventType).filter(EventType.name == event_name).first()
-    )
+    key = url_path.strip("/")
+    now = time.monotonic()
+    with _landing_page_html_lock:
+        entry = _landing_page_html.get(key)
+        if entry is not None and now - entry[0] < LANDING_PAGE_CACHE_TTL:
+            _landing_page_html.move_to_end(key)
+            return entry[1]
+
+    # Only the (deferred) HTML column, not the page plus a second load for it
+    html = session.execute(_LANDING_PAGE_HTML_BY_URL_PATH, {"url_path": key}).scalar()
+
+    with _landing_page_html_lock:
+        _landing_page_html[key] = (now, html)
+        _landing_page_html.move_to_end(key)
+        while len(_landing_page_html) > LANDING_PAGE_CACHE_SIZE:
+            _landing_page_html.popitem(last=False)
+    return html
+
+
+def invalidate_landing_page_cache() -> None:
+    """Drop every cached landing page so the next request reads the database."""
+    with _landing_page_html_lock:
+        _landing_page_html.clear()
+
+
+def get_event_type_id(session: Session, event_name: str) -> int:
+    """
+    Get an event type ID by name from the process-wide EVENT_TYPE_IDS map.
+
+    On a miss the whole (tiny) event_types table is reloaded in one query;
+    a name that is still unknown is inserted.
 
-    if not event_type:
-        event_type = EventType(name=event_name)
-        session.add(event_type)
-        session.flush()
+    Args:
+        session: SQLAlchemy session
+        event_name: Event type name (e.g., "link_clicked")
 
-    return event_type
+    Returns:
+        Event type ID
+    """
+    event_type_id = EVENT_TYPE_IDS.get(event_name)
+    if event_type_id is not None:
+        return event_type_id
+
+    event_type_id = load_event_type_ids(session).get(event_name)
+    if event_type_id is not None:
+        return event_type_id
+
+    # Not cached until a later reload sees the row committed
+    event_type_id = session.execute(
+        pg_insert(EventType)
+        .values(name=event_name)
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(EventType.id)
+    ).scalar()
+    if event_type_id is None:
+        event_type_id = session.execute(
+            select(EventType.id).where(EventType.name == event_name)
+        ).scalar_one()
+    return event_type_id
+
+
+# Single-row inserts as Core statements built once: no ORM object, unit of
+# work or flush, and the compiled form stays in the engine's statement cache
+_INSERT_EVENT = insert(Event).returning(Event.id)
+_INSERT_FORM_SUBMISSION = insert(FormSubmission).returning(FormSubmission.id)
 
 
 def log_event(
@@ -307,7 +367,7 @@ def log_event(
     os_name: Optional[str] = None,
     device_type: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
-) -> Event:
+) -> int:
     """
     Log a tracking event to the database.
 
@@ -323,27 +383,340 @@ def log_event(
         metadata: Additional metadata as dict
 
     Returns:
-        Created Event object
+        Created event ID
     """
-    event_type = get_or_create_event_type(session, event_type_name)
-
-    event = Event(
-        campaign_target_id=campaign_target_id,
-        event_type_id=event_type.id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        browser=browser,
-        os=os_name,
-        device_type=device_type,
-        created_at=datetime.utcnow(),
-    )
-    session.add(event)
-    session.flush()
+    event_id = session.execute(
+        _INSERT_EVENT,
+        {
+            "campaign_target_id": campaign_target_id,
+            "event_type_id": get_event_type_id(session, event_type_name),
+            "ip_address": ip_address,
+            "user_agent_id": get_user_agent_id(session, user_agent),
+            "browser": browser,
+            "os": os_name,
+            "device_type": device_type,
+        },
+    ).scalar_one()
 
     logger.info(
-        f"Event logged: {event_type_name} for campaign_target={campaign_target_id}"
+        "Event logged: %s for campaign_target=%s", event_type_name, campaign_target_id
     )
-    return event
+    return event_id
+
+
+_ASYNC_COMMIT = text("SET LOCAL synchronous_commit = off")
+
+_EVENT_COPY_COLUMNS = [
+    "campaign_target_id",
+    "event_type_id",
+    "ip_address",
+    "user_agent_id",
+    "browser",
+    "os",
+    "device_type",
+    "created_at",
+]
+
+
+class QueuedEvent(NamedTuple):
+    """A tracking event waiting in the EventBuffer (see queue_event)."""
+
+    campaign_target_id: Optional[int]
+    event_type_name: str
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    browser: Optional[str]
+    os: Optional[str]
+    device_type: Optional[str]
+    created_at: datetime
+    new_status: Optional[str]
+
+
+def _event_ua_fields(event: QueuedEvent) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Browser, OS and device type for an event, parsed from its user agent unless given."""
+    if event.browser is None and event.user_agent is not None:
+        return parse_user_agent(event.user_agent)
+    return event.browser, event.os, event.device_type
+
+
+class EventBuffer:
+    """
+    Queue tracking events and insert them in batches from a background thread.
+
+    Request handlers enqueue a QueuedEvent and return without waiting for the insert.
+    The writer thread collects up to ``max_batch`` events or waits at most
+    ``max_wait`` seconds, then parses user agents, resolves event type and
+    user agent ids, streams the batch in with COPY and advances the targets'
+    statuses, in one transaction. When the queue is full the event is written
+    synchronously instead of being dropped. Events still queued when the
+    process dies are lost.
+    """
+
+    def __init__(self, maxsize: int = 10000, max_batch: int = 1000, max_wait: float = 0.2):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[QueuedEvent]" = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_started(self) -> None:
+        # Per process: gunicorn may fork after this module was imported
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="event-writer", daemon=True).start()
+            atexit.register(self.flush)
+            self._pid = os.getpid()
+
+    def put(self, row: QueuedEvent) -> None:
+        """Queue one event for the writer thread."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("Event queue full, writing event synchronously")
+            self._write([row])
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.error("Dropped %d events: %s", len(batch), e)
+
+    def flush(self) -> None:
+        """Write every queued event now (called at interpreter exit)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _write(self, rows: List[QueuedEvent]) -> None:
+        with db_manager.get_session() as session:
+            # Tracking events tolerate losing the last few hundred ms on a
+            # server crash; don't wait for the WAL flush at commit
+            session.execute(_ASYNC_COMMIT)
+
+            # Resolved once per batch: an id first inserted by this
+            # transaction must not be looked up (and cached) again before commit
+            event_type_ids: Dict[str, int] = {}
+            user_agent_ids: Dict[str, Optional[int]] = {}
+            for row in rows:
+                event_type_name = row.event_type_name
+                if event_type_name not in event_type_ids:
+                    event_type_ids[event_type_name] = get_event_type_id(session, event_type_name)
+                user_agent = row.user_agent
+                if user_agent not in user_agent_ids:
+                    user_agent_ids[user_agent] = get_user_agent_id(session, user_agent)
+
+            copy_rows(
+                session,
+                Event,
+                _EVENT_COPY_COLUMNS,
+                (
+                    (
+                        row.campaign_target_id,
+                        event_type_ids[row.event_type_name],
+                        row.ip_address,
+                        user_agent_ids[row.user_agent],
+                        *_event_ua_fields(row),
+                        row.created_at,
+                    )
+                    for row in rows
+                ),
+            )
+
+            # Furthest status per target; the UPDATE only ever moves it forward
+            new_statuses: Dict[int, str] = {}
+            for row in rows:
+                campaign_target_id, new_status = row.campaign_target_id, row.new_status
+                if campaign_target_id is None or not STATUS_RANK.get(new_status, 0):
+                    continue
+                current = new_statuses.get(campaign_target_id)
+                if current is None or STATUS_RANK[new_status] > STATUS_RANK[current]:
+                    new_statuses[campaign_target_id] = new_status
+            new_statuses = _drop_applied_statuses(new_statuses)
+            if new_statuses:
+                # In id order, so concurrent writers lock campaign_targets rows
+                # in the same order instead of deadlocking
+                session.execute(
+                    _ADVANCE_STATUS,
+                    [
+                        {"campaign_target_id": campaign_target_id, "new_status": new_status}
+                        for campaign_target_id, new_status in sorted(new_statuses.items())
+                    ],
+                )
+        # Only once committed: a rolled-back advance must be retried
+        _remember_applied_statuses(new_statuses)
+
+
+# Writer batching: events are inserted once EVENT_BATCH_SIZE are queued or
+# EVENT_FLUSH_INTERVAL seconds after the first one, whichever comes first
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "10000"))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "1000"))
+EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "0.2"))
+
+event_buffer = EventBuffer(EVENT_QUEUE_SIZE, EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL)
+
+
+def queue_event(
+    campaign_target_id: Optional[int],
+    event_type_name: str,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    browser: Optional[str] = None,
+    os_name: Optional[str] = None,
+    device_type: Optional[str] = None,
+    new_status: Optional[str] = None,
+) -> None:
+    """
+    Record a tracking event without waiting for the database.
+
+    Takes the same arguments as log_event() minus the session. The event is
+    timestamped now and inserted by the background writer shortly after;
+    browser, os_name and device_type are parsed from user_agent there unless
+    given. If new_status is given, the writer also advances the campaign target to
+    it in the same transaction (see update_campaign_target_status()).
+    """
+    event_buffer.put(
+        QueuedEvent(
+            campaign_target_id,
+            event_type_name,
+            ip_address,
+            user_agent,
+            browser,
+            os_name,
+            device_type,
+            datetime.utcnow(),
+            new_status,
+        )
+    )
+
+
+# Repeat fetches of the same tracking URL from the same address (image proxies,
+# prefetchers) within this many seconds are recorded once; 0 disables. Kept per
+# process, so a repeat served by another worker may still be recorded
+EVENT_DEDUP_WINDOW = float(os.getenv("EVENT_DEDUP_WINDOW", "60"))
+EVENT_DEDUP_SIZE = 10000
+
+_recent_events: "OrderedDict[tuple, float]" = OrderedDict()
+_recent_events_lock = threading.Lock()
+
+
+def should_record(*key: Any) -> bool:
+    """
+    Check whether an event should be recorded, remembering it for EVENT_DEDUP_WINDOW.
+
+    Args:
+        key: Values identifying the event, e.g. (tracking_token, event_type_name, ip_address)
+
+    Returns:
+        False if the same key was already recorded within the window, True otherwise
+    """
+    if EVENT_DEDUP_WINDOW <= 0:
+        return True
+
+    now = time.monotonic()
+    with _recent_events_lock:
+        seen_at = _recent_events.get(key)
+        if seen_at is not None and now - seen_at < EVENT_DEDUP_WINDOW:
+            return False
+        _recent_events[key] = now
+        _recent_events.move_to_end(key)
+        while len(_recent_events) > EVENT_DEDUP_SIZE:
+            _recent_events.popitem(last=False)
+    return True
+
+
+def bulk_insert_events(rows: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+    """
+    Insert many tracking events in one transaction.
+
+    For ingest and backfill paths; request handlers hand their single event
+    to queue_event(). Rows go through Core insert() in batches, which the
+    engine folds into multi-row INSERT statements.
+
+    Args:
+        rows: Dicts keyed by Event column name (event_type_id and
+            user_agent_id, not the names)
+        batch_size: Maximum number of rows per INSERT statement
+
+    Returns:
+        Number of events inserted
+    """
+    rows = list(rows)
+    with db_manager.get_session() as session:
+        bulk_insert(session, Event, rows, batch_size=batch_size)
+    logger.info("Bulk inserted %d events", len(rows))
+    return len(rows)
+
+
+# Status hierarchy: a target only ever moves forward along this list
+STATUS_ORDER = ("pending", "sent", "opened", "clicked", "submitted")
+STATUS_RANK = {status: rank for rank, status in enumerate(STATUS_ORDER)}
+
+# One conditional UPDATE instead of reading the row first. Statuses outside
+# the list rank as "pending"; an unknown new status never matches
+_STATUS_ARRAY = "ARRAY[" + ", ".join(f"'{status}'" for status in STATUS_ORDER) + "]"
+_ADVANCE_STATUS = text(
+    f"UPDATE campaign_targets SET status = :new_status "
+    f"WHERE id = :campaign_target_id "
+    f"AND COALESCE(array_position({_STATUS_ARRAY}, status::text), 1) "
+    f"< array_position({_STATUS_ARRAY}, CAST(:new_status AS text))"
+)
+
+# Status each target was last advanced to by this process's event writer.
+# Repeat opens and clicks would otherwise send an UPDATE that matches nothing;
+# entries expire so a status changed elsewhere is picked up again
+STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", "300"))
+STATUS_CACHE_SIZE = 50000
+
+_applied_statuses: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+_applied_statuses_lock = threading.Lock()
+
+
+def _drop_applied_statuses(new_statuses: Dict[int, str]) -> Dict[int, str]:
+    """Return the status advances not already applied within STATUS_CACHE_TTL."""
+    now = time.monotonic()
+    pending = {}
+    with _applied_statuses_lock:
+        for campaign_target_id, new_status in new_statuses.items():
+            entry = _applied_statuses.get(campaign_target_id)
+            if (
+                entry is not None
+                and now - entry[0] < STATUS_CACHE_TTL
+                and entry[1] >= STATUS_RANK[new_status]
+            ):
+                continue
+            pending[campaign_target_id] = new_status
+    return pending
+
+
+def _remember_applied_statuses(new_statuses: Dict[int, str]) -> None:
+    """Record committed status advances (see _drop_applied_statuses)."""
+    now = time.monotonic()
+    with _applied_statuses_lock:
+        for campaign_target_id, new_status in new_statuses.items():
+            _applied_statuses[campaign_target_id] = (now, STATUS_RANK[new_status])
+            _applied_statuses.move_to_end(campaign_target_id)
+        while len(_applied_statuses) > STATUS_CACHE_SIZE:
+            _applied_statuses.popitem(last=False)
 
 
 def update_campaign_target_status(
@@ -360,34 +733,76 @@ def update_campaign_target_status(
         new_status: New status value
 
     Returns:
-        True if updated, False if not found
+        True if the status moved forward, False if it was already at or past
+        new_status or the target does not exist
     """
-    campaign_target = (
-        session.query(CampaignTarget)
-        .filter(CampaignTarget.id == campaign_target_id)
-        .first()
-    )
-
-    if not campaign_target:
+    # "pending" and unknown statuses can never move a target forward
+    if not STATUS_RANK.get(new_status, 0):
         return False
 
-    # Status hierarchy - only update if new status is "higher"
-    status_order = ["pending", "sent", "opened", "clicked", "submitted"]
-    current_idx = (
-        status_order.index(campaign_target.status)
-        if campaign_target.status in status_order
-        else 0
+    result = session.execute(
+        _ADVANCE_STATUS,
+        {"campaign_target_id": campaign_target_id, "new_status": new_status},
     )
-    new_idx = status_order.index(new_status) if new_status in status_order else 0
-
-    if new_idx > current_idx:
-        campaign_target.status = new_status
-        session.flush()
+    if result.rowcount:
         logger.info(
-            f"Updated campaign_target {campaign_target_id} status to {new_status}"
+            "Updated campaign_target %s status to %s", campaign_target_id, new_status
         )
+        return True
+    return False
+
+
+# A tracked form submission in one statement and one round trip: find the
+# target, insert its form_submissions row and advance it to "submitted"
+_RECORD_FORM_SUBMISSION = text(
+    f"WITH target AS ("
+    f" SELECT ct.id, ct.target_id, lp.redirect_url FROM campaign_targets ct"
+    f" LEFT JOIN campaigns c ON c.id = ct.campaign_id"
+    f" LEFT JOIN landing_pages lp ON lp.id = c.landing_page_id"
+    f" WHERE ct.tracking_token = :tracking_token"
+    f"), submission AS ("
+    f" INSERT INTO form_submissions (campaign_target_id, ip_address, user_agent)"
+    f" SELECT id, :ip_address, :user_agent FROM target"
+    f"), advanced AS ("
+    f" UPDATE campaign_targets SET status = 'submitted'"
+    f" WHERE id IN (SELECT id FROM target)"
+    f" AND COALESCE(array_position({_STATUS_ARRAY}, status::text), 1)"
+    f" < array_position({_STATUS_ARRAY}, 'submitted')"
+    f") SELECT id, target_id, redirect_url FROM target"
+).bindparams(bindparam("tracking_token", type_=TrackingToken()))
+
+
+def record_form_submission(
+    session: Session,
+    tracking_token: str,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> Optional[Row]:
+    """
+    Record a form submission for the target owning a tracking token.
 
-    return True
+    Does the work of get_campaign_target_by_token(with_landing_page=True),
+    create_form_submission() and update_campaign_target_status(..., "submitted")
+    in a single statement.
+
+    Args:
+        session: SQLAlchemy session
+        tracking_token: The tracking token sent with the form
+        ip_address: Submitter IP address
+        user_agent: Submitter user agent
+
+    Returns:
+        Row with id, target_id and redirect_url, or None if the token is unknown
+        (nothing is written then)
+    """
+    return session.execute(
+        _RECORD_FORM_SUBMISSION,
+        {
+            "tracking_token": tracking_token,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+        },
+    ).first()
 
 
 def create_form_submission(
@@ -395,7 +810,7 @@ def create_form_submission(
     campaign_target_id: int,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
-) -> FormSubmission:
+) -> int:
     """
     Create a form submission record.
 
@@ -406,28 +821,75 @@ def create_form_submission(
         user_agent: Client user agent
 
     Returns:
-        Created FormSubmission object
+        Created form submission ID
     """
-    submission = FormSubmission(
-        campaign_target_id=campaign_target_id,
-        submitted_at=datetime.utcnow(),
-        ip_address=ip_address,
-        user_agent=user_agent,
-    )
-    session.add(submission)
-    session.flush()
-    return submission
+    return session.execute(
+        _INSERT_FORM_SUBMISSION,
+        {
+            "campaign_target_id": campaign_target_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+        },
+    ).scalar_one()
+
 
+active_config_cache = ActiveConfigCache(ActiveConfiguration)
 
-def get_active_landing_page_config(session: Session) -> Optional[ActiveConfiguration]:
+
+def get_active_landing_page_config(session: Session):
     """
     Get the active landing page configuration.
 
+    Served from an in-process snapshot that is invalidated by the
+    active_config_changed NOTIFY, so most requests skip the query.
+
     Returns:
-        ActiveConfiguration object or None if not found
+        Snapshot of the ActiveConfiguration row or None if not found
     """
-    return session.query(ActiveConfiguration).filter(ActiveConfiguration.id == 1).first()
+    return active_config_cache.get(session)
+
+
+# Active campaign id by landing page id, None included. Campaigns are
+# activated and completed from webadmin's process without a NOTIFY, so
+# entries expire instead of being invalidated
+ACTIVE_CAMPAIGN_CACHE_TTL = float(os.getenv("ACTIVE_CAMPAIGN_CACHE_TTL", "15"))
+
+_active_campaign_ids: Dict[int, Tuple[float, Optional[int]]] = {}
+_active_campaign_ids_lock = threading.Lock()
+
+
+def find_active_campaign_id(session: Session) -> Optional[int]:
+    """
+    Get the ID of the active campaign for the active landing page, cached in-process.
+
+    Args:
+        session: SQLAlchemy session used on a cache miss
+
+    Returns:
+        Campaign ID or None if no campaign is active
+    """
+    config = get_active_landing_page_config(session)
+    if not config or not config.active_landing_page_id:
+        return None
+    landing_page_id = config.active_landing_page_id
+
+    now = time.monotonic()
+    with _active_campaign_ids_lock:
+        entry = _active_campaign_ids.get(landing_page_id)
+        if entry is not None and now - entry[0] < ACTIVE_CAMPAIGN_CACHE_TTL:
+            return entry[1]
+
+    campaign_id = session.execute(
+        select(Campaign.id)
+        .where(Campaign.landing_page_id == landing_page_id, Campaign.status == "active")
+        .limit(1)
+    ).scalar()
+
+    with _active_campaign_ids_lock:
+        _active_campaign_ids[landing_page_id] = (now, campaign_id)
+    return campaign_id
 
 
 # Create global database manager instance
 db_manager = DatabaseManager()
+active_config_cache.listen(db_manager.engine)
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings for the Phishly phishing server.
+
+Requests mostly wait on PostgreSQL and the filesystem, so the default gevent
+workers keep serving other requests during those waits. Gunicorn monkey-patches
+the worker before the app is imported, and psycopg 3 cooperates with gevent
+without psycogreen. Database work is still bounded by the SQLAlchemy pool
+(DB_POOL_SIZE + DB_MAX_OVERFLOW per process); extra requests wait up to
+DB_POOL_TIMEOUT.
+
+GUNICORN_WORKER_CLASS=gthread switches back to a thread pool per worker.
+"""
+
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+# Concurrent requests per gevent worker
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+# Threads per gthread worker
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
@@ -13,11 +13,20 @@ The server reads from this cache for fast response times.
 """
 
 import os
+import re
+import gzip
 import json
+import hashlib
+import functools
 import logging
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import safe_join
 from flask import (
     Flask,
     abort,
@@ -31,17 +40,16 @@ from flask import (
 from database import (
     db_manager,
     get_campaign_target_by_token,
-    get_landing_page_by_url_path,
-    get_active_landing_page_config,
-    log_event,
-    update_campaign_target_status,
-    create_form_submission,
-    Campaign,
+    get_landing_page_html,
+    find_active_campaign_id,
+    queue_event,
+    should_record,
+    record_form_submission,
 )
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
@@ -50,10 +58,29 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 CACHE_DIR = Path(os.getenv("CACHE_DIR", "/app/cache"))  # Legacy cache support
 CAMPAIGN_DEPLOYMENTS_DIR = Path("/app/campaign_landing_pages")  # NEW: Campaign deployments
+# Checked once: the deployments volume is mounted before the server starts
+CAMPAIGN_DEPLOYMENTS_ENABLED = CAMPAIGN_DEPLOYMENTS_DIR.is_dir()
 PHISHING_DOMAIN = os.getenv("PHISHING_DOMAIN", "phishing.example.com")
+# Let the reverse proxy send landing page files itself (X-Accel-Redirect);
+# requires the proxy to mount both directories, see reverse-proxy/Caddyfile
+ACCEL_REDIRECT = os.getenv("ACCEL_REDIRECT", "false").lower() == "true"
+# Directory -> path prefix it is mounted under in the proxy
+ACCEL_REDIRECT_ROOTS = (
+    (CAMPAIGN_DEPLOYMENTS_DIR, "/campaign_landing_pages/"),
+    (CACHE_DIR, "/cache/"),
+)
 
 # Create Flask app
 app = Flask(__name__, static_folder=None)
+# Number of reverse proxies in front (Caddy: 1). ProxyFix takes the client
+# address, scheme and host they appended, once per request in WSGI, instead of
+# trusting the first X-Forwarded-For entry the client itself may have sent.
+# 0 (no proxy) ignores forwarded headers entirely
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "1"))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(
+        app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES
+    )
 
 
 # ============================================
@@ -62,85 +89,88 @@ app = Flask(__name__, static_folder=None)
 
 
 def get_client_ip() -> str:
-    """Get the real client IP address, handling proxies."""
-    if request.headers.get("X-Forwarded-For"):
-        return request.headers.get("X-Forwarded-For").split(",")[0].strip()
-    if request.headers.get("X-Real-IP"):
-        return request.headers.get("X-Real-IP")
+    """Get the real client IP address (resolved from the proxy headers by ProxyFix)."""
     return request.remote_addr or "unknown"
 
 
-def parse_user_agent(user_agent_str: str) -> dict:
-    """Parse user agent string to extract browser, OS, and device type."""
-    ua = user_agent_str.lower() if user_agent_str else ""
-
-    # Simple browser detection
-    browser = "unknown"
-    if "chrome" in ua and "edg" not in ua:
-        browser = "Chrome"
-    elif "firefox" in ua:
-        browser = "Firefox"
-    elif "safari" in ua and "chrome" not in ua:
-        browser = "Safari"
-    elif "edg" in ua:
-        browser = "Edge"
-    elif "msie" in ua or "trident" in ua:
-        browser = "Internet Explorer"
-
-    # Simple OS detection
-    os_name = "unknown"
-    if "windows" in ua:
-        os_name = "Windows"
-    elif "mac os" in ua or "macintosh" in ua:
-        os_name = "macOS"
-    elif "linux" in ua:
-        os_name = "Linux"
-    elif "android" in ua:
-        os_name = "Android"
-    elif "iphone" in ua or "ipad" in ua:
-        os_name = "iOS"
-
-    # Simple device type detection
-    device_type = "desktop"
-    if "mobile" in ua or "android" in ua or "iphone" in ua:
-        device_type = "mobile"
-    elif "ipad" in ua or "tablet" in ua:
-        device_type = "tablet"
-
-    return {
-        "browser": browser,
-        "os": os_name,
-        "device_type": device_type,
-    }
+def get_user_agent() -> str:
+    """Get the User-Agent header, read straight from the WSGI environ."""
+    return request.environ.get("HTTP_USER_AGENT", "")
 
 
 def get_active_campaign_id() -> int | None:
     """
-    Get the active campaign ID from the database.
+    Get the active campaign ID (cached in-process for a few seconds).
 
     Returns:
         Campaign ID if found, None otherwise
     """
     try:
         with db_manager.get_session() as session:
-            # Query for active landing page configuration
-            config = get_active_landing_page_config(session)
-            if config and config.active_landing_page_id:
-                # Get campaign using this landing page
-                campaign = session.query(Campaign).filter(
-                    Campaign.landing_page_id == config.active_landing_page_id,
-                    Campaign.status == 'active'
-                ).first()
-                if campaign:
-                    return campaign.id
+            return find_active_campaign_id(session)
     except Exception as e:
-        logger.error(f"Error getting active campaign: {e}")
+        logger.error("Error getting active campaign: %s", e)
     return None
 
 
+# Resolved (cache_dir, info) by (normalized path, active campaign id, version of
+# the deployment root), misses included. Deployments are written by webadmin's
+# container, which can't reach this cache: keying on the root's inode and mtime
+# (see _dir_version) makes a redeploy or new preview visible on the next
+# request, at one stat per hit. Legacy cache directories rely on the TTL
+LANDING_PAGE_LOOKUP_TTL = float(os.getenv("LANDING_PAGE_LOOKUP_TTL", "30"))
+LANDING_PAGE_LOOKUP_SIZE = 1024
+
+_landing_page_lookups: "OrderedDict[tuple, tuple]" = OrderedDict()
+_landing_page_lookups_lock = threading.Lock()
+
+
 def find_cached_landing_page(url_path: str) -> tuple[Path, dict] | None:
     """
-    Find cached landing page by URL path.
+    Find cached landing page by URL path, memoizing the filesystem lookup.
+
+    Returns:
+        Tuple of (cache_dir_path, landing_page_info) or None if not found
+    """
+    normalized_path = url_path.strip("/")
+    active_campaign_id = get_active_campaign_id() if CAMPAIGN_DEPLOYMENTS_ENABLED else None
+    root = _deployment_root(normalized_path, active_campaign_id)
+    key = (normalized_path, active_campaign_id, _dir_version(root))
+
+    now = time.monotonic()
+    with _landing_page_lookups_lock:
+        entry = _landing_page_lookups.get(key)
+        if entry is not None and now - entry[0] < LANDING_PAGE_LOOKUP_TTL:
+            _landing_page_lookups.move_to_end(key)
+            return entry[1]
+
+    result = _resolve_landing_page(normalized_path, active_campaign_id)
+
+    with _landing_page_lookups_lock:
+        _landing_page_lookups[key] = (now, result)
+        _landing_page_lookups.move_to_end(key)
+        while len(_landing_page_lookups) > LANDING_PAGE_LOOKUP_SIZE:
+            _landing_page_lookups.popitem(last=False)
+    return result
+
+
+def _is_preview_path(normalized_path: str) -> bool:
+    return normalized_path.startswith("preview/") or normalized_path == "preview"
+
+
+def _deployment_root(normalized_path: str, active_campaign_id: int | None) -> Path:
+    """Deployment directory a path is served from first (preview, campaign or "active")."""
+    if _is_preview_path(normalized_path):
+        return CAMPAIGN_DEPLOYMENTS_DIR / "preview"
+    # No active campaign - "active" deployment (for testing without campaign)
+    return CAMPAIGN_DEPLOYMENTS_DIR / (str(active_campaign_id) if active_campaign_id else "active")
+
+
+def _resolve_landing_page(
+    normalized_path: str, active_campaign_id: int | None
+) -> tuple[Path, dict] | None:
+    """
+    Find cached landing page on disk.
 
     Priority:
     1. Preview deployment (campaign_landing_pages/preview/) - if path starts with "preview/"
@@ -148,113 +178,285 @@ def find_cached_landing_page(url_path: str) -> tuple[Path, dict] | None:
     3. Active landing page cache (cache/active/{url_path}/) - LEGACY
     4. Campaign-specific cache (cache/{campaign_id}/{url_path}/) - LEGACY
 
+    Every directory is matched against a manifest (see _deployment_manifest
+    and _scan_legacy_cache) instead of probing the filesystem.
+
+    Args:
+        normalized_path: URL path without leading/trailing slashes
+        active_campaign_id: Active campaign, if campaign deployments exist
+
     Returns:
         Tuple of (cache_dir_path, landing_page_info) or None if not found
     """
-    normalized_path = url_path.strip("/")
-
     # PREVIEW: Check if this is a preview request (path starts with "preview/")
-    if normalized_path.startswith("preview/") or normalized_path == "preview":
+    if _is_preview_path(normalized_path):
         preview_dir = CAMPAIGN_DEPLOYMENTS_DIR / "preview"
-        if preview_dir.exists():
-            # Remove "preview/" prefix from path
-            preview_path = normalized_path.replace("preview/", "", 1) if normalized_path.startswith("preview/") else ""
-
-            if not preview_path:
-                # Just "/preview" - serve index.html
-                index_file = preview_dir / "index.html"
-                if index_file.exists():
-                    return preview_dir, {"preview": True}
-            else:
-                # "/preview/something.html" or "/preview/assets/..."
-                direct_file = preview_dir / preview_path
-                if direct_file.exists() and direct_file.is_file():
-                    return preview_dir, {"preview": True, "file": preview_path}
-
-                # Try as directory with index.html
-                page_dir = preview_dir / preview_path
-                index_file = page_dir / "index.html"
-                if index_file.exists():
-                    return page_dir, {"preview": True}
+        # Remove "preview/" prefix from path; just "/preview" serves index.html
+        preview_path = normalized_path[len("preview/"):]
+        kind = _deployment_manifest(preview_dir).get(preview_path)
+        if kind == "file":
+            # "/preview/something.html" or "/preview/assets/..."
+            return preview_dir, {"preview": True, "file": preview_path}
+        if kind == "index":
+            return preview_dir / preview_path, {"preview": True}
 
     # NEW: Check campaign deployments (highest priority for non-preview)
-    if CAMPAIGN_DEPLOYMENTS_DIR.exists():
-        # Try to find active campaign
-        active_campaign_id = get_active_campaign_id()
-        if active_campaign_id:
-            campaign_dir = CAMPAIGN_DEPLOYMENTS_DIR / str(active_campaign_id)
-            if campaign_dir.exists():
-                # Try exact path match first (e.g., "login.html")
-                direct_file = campaign_dir / normalized_path
-                if direct_file.exists() and direct_file.is_file():
-                    return campaign_dir, {"campaign_id": active_campaign_id, "file": normalized_path}
-
-                # Try as directory with index.html
-                page_dir = campaign_dir / normalized_path
-                index_file = page_dir / "index.html"
-                if index_file.exists():
-                    return page_dir, {"campaign_id": active_campaign_id}
-
-                # Try root index.html if path is empty or "/"
-                if not normalized_path:
-                    index_file = campaign_dir / "index.html"
-                    if index_file.exists():
-                        return campaign_dir, {"campaign_id": active_campaign_id}
-
-                # FALLBACK: If path not found, serve from campaign root
-                # This handles cases where url_path like "/en/home" is configured
-                # but files are deployed to campaign root (not a subdirectory)
-                root_index = campaign_dir / "index.html"
-                if root_index.exists():
-                    logger.info(f"Path '{normalized_path}' not found, falling back to campaign root")
-                    return campaign_dir, {"campaign_id": active_campaign_id}
-        else:
-            # No active campaign - check for "active" deployment (for testing without campaign)
-            active_dir = CAMPAIGN_DEPLOYMENTS_DIR / "active"
-            if active_dir.exists():
-                # Try exact path match first
-                direct_file = active_dir / normalized_path
-                if direct_file.exists() and direct_file.is_file():
-                    return active_dir, {"source": "active", "file": normalized_path}
-
-                # Try as directory with index.html
-                page_dir = active_dir / normalized_path
-                index_file = page_dir / "index.html"
-                if index_file.exists():
-                    return page_dir, {"source": "active"}
-
-                # Try root index.html if path is empty or "/"
-                if not normalized_path:
-                    index_file = active_dir / "index.html"
-                    if index_file.exists():
-                        return active_dir, {"source": "active"}
-
-                # FALLBACK: If path not found, serve from active root
-                root_index = active_dir / "index.html"
-                if root_index.exists():
-                    logger.info(f"Path '{normalized_path}' not found, falling back to active root")
-                    return active_dir, {"source": "active"}
+    if active_campaign_id:
+        deployment_dir = CAMPAIGN_DEPLOYMENTS_DIR / str(active_campaign_id)
+        info = {"campaign_id": active_campaign_id}
+    else:
+        # No active campaign - check for "active" deployment (for testing without campaign)
+        deployment_dir = CAMPAIGN_DEPLOYMENTS_DIR / "active"
+        info = {"source": "active"}
+
+    manifest = _deployment_manifest(deployment_dir)
+    kind = manifest.get(normalized_path)
+    if kind == "file":
+        # Exact file match (e.g., "login.html")
+        return deployment_dir, {**info, "file": normalized_path}
+    if kind == "index":
+        # Directory with index.html, or the root for an empty path
+        return deployment_dir / normalized_path, info
+    if manifest.get("") == "index":
+        # FALLBACK: If path not found, serve from the deployment root. This
+        # handles cases where url_path like "/en/home" is configured but
+        # files are deployed to the root (not a subdirectory)
+        logger.info("Path '%s' not found, falling back to %s", normalized_path, deployment_dir)
+        return deployment_dir, info
 
     # LEGACY: Check active cache
     active_cache_dir = CACHE_DIR / "active"
-    if active_cache_dir.exists():
-        page_dir = active_cache_dir / normalized_path
-        index_file = page_dir / "index.html"
-        if index_file.exists():
-            return page_dir, {"source": "active"}
+    if _deployment_manifest(active_cache_dir).get(normalized_path) == "index":
+        return active_cache_dir / normalized_path, {"source": "active"}
 
     # LEGACY: Fall back to campaign-specific caches
-    if CACHE_DIR.exists():
-        for campaign_dir in CACHE_DIR.iterdir():
-            if campaign_dir.is_dir() and campaign_dir.name != "active":
-                page_dir = campaign_dir / normalized_path
-                index_file = page_dir / "index.html"
-                if index_file.exists():
-                    return page_dir, {"campaign_id": campaign_dir.name}
+    return _manifest("legacy", _scan_legacy_cache, _dir_version(CACHE_DIR)).get(normalized_path)
+
+
+# Directory listings that replace per-request filesystem probes. Each is
+# checked against its root directory's version (one stat per request): webadmin
+# replaces a deployment by deleting and copying the directory and then touches
+# the root (campaigns) or writes its .preview_mode marker (previews), so a
+# redeploy changes the root's inode or mtime. Changes deeper in the tree are
+# picked up after LANDING_MANIFEST_TTL
+LANDING_MANIFEST_TTL = float(os.getenv("LANDING_MANIFEST_TTL", "60"))
+
+_manifests: dict[str, tuple[float, tuple | None, dict]] = {}
+_manifests_lock = threading.Lock()
+
+
+def _dir_version(path: Path) -> tuple[int, int] | None:
+    """(st_ino, st_mtime_ns) of a directory, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
 
+def _manifest(key: str, scan, version: tuple | None) -> dict:
+    """
+    Return the manifest cached under ``key``, calling ``scan()`` when its
+    root's ``version`` changed or it is older than LANDING_MANIFEST_TTL.
+    """
+    entry = _manifests.get(key)
+    if (
+        entry is not None
+        and entry[1] == version
+        and time.monotonic() - entry[0] < LANDING_MANIFEST_TTL
+    ):
+        return entry[2]
+    with _manifests_lock:
+        entry = _manifests.get(key)
+        if (
+            entry is None
+            or entry[1] != version
+            or time.monotonic() - entry[0] >= LANDING_MANIFEST_TTL
+        ):
+            # The version is taken before the scan, so a change made during
+            # the walk is rescanned on the next request
+            entry = (time.monotonic(), version, scan())
+            _manifests[key] = entry
+    return entry[2]
+
+
+def _scan_deployment(root: Path) -> dict[str, str]:
+    """Map every file under root to "file" and every directory holding an index.html to "index"."""
+    entries: dict[str, str] = {}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        relpath = os.path.relpath(dirpath, root)
+        base = "" if relpath == "." else relpath.replace(os.sep, "/") + "/"
+        names = set(filenames)
+        for filename in filenames:
+            # Precompressed siblings written at deploy time are for the proxy only
+            if filename.endswith(".gz") and filename[:-3] in names:
+                continue
+            entries[base + filename] = "file"
+        if "index.html" in filenames:
+            entries[base.rstrip("/")] = "index"
+    return entries
+
+
+def _deployment_manifest(root: Path) -> dict[str, str]:
+    """Manifest of a deployment directory (empty if it does not exist)."""
+    return _manifest(str(root), functools.partial(_scan_deployment, root), _dir_version(root))
+
+
+def _scan_legacy_cache() -> dict[str, tuple[Path, dict]]:
+    """Map each page path under CACHE_DIR/<campaign_id>/ to its directory."""
+    pages: dict[str, tuple[Path, dict]] = {}
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            campaign_dirs = sorted(
+                (entry.name, entry.path)
+                for entry in entries
+                if entry.name != "active" and entry.is_dir(follow_symlinks=False)
+            )
+    except OSError:
+        return pages
+
+    for campaign_id, campaign_path in campaign_dirs:
+        for dirpath, _dirnames, filenames in os.walk(campaign_path):
+            if "index.html" in filenames:
+                relpath = os.path.relpath(dirpath, campaign_path)
+                page_path = "" if relpath == "." else relpath.replace(os.sep, "/")
+                pages.setdefault(page_path, (Path(dirpath), {"campaign_id": campaign_id}))
+    return pages
+
+
+# Landing page HTML by absolute path: (mtime_ns, body, gzipped body, etag,
+# checked_at). The file is stat()ed at most every LANDING_HTML_RECHECK seconds
+# to notice redeployments, and read and compressed once per version. Bounded
+# by total cached bytes
+LANDING_HTML_CACHE_BYTES = int(os.getenv("LANDING_HTML_CACHE_BYTES", str(32 * 1024 * 1024)))
+LANDING_HTML_RECHECK = float(os.getenv("LANDING_HTML_RECHECK", "1"))
+
+_landing_html: "OrderedDict[str, tuple]" = OrderedDict()
+_landing_html_size = 0
+_landing_html_lock = threading.Lock()
+
+
+def load_cached_html(path: str) -> tuple[bytes, bytes, str]:
+    """
+    Return (body, gzipped body, etag) for an HTML file, cached until it changes.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    global _landing_html_size
+
+    now = time.monotonic()
+    with _landing_html_lock:
+        entry = _landing_html.get(path)
+        if entry is not None and now - entry[4] < LANDING_HTML_RECHECK:
+            _landing_html.move_to_end(path)
+            return entry[1:4]
+
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _landing_html_lock:
+        entry = _landing_html.get(path)
+        if entry is not None and entry[0] == mtime_ns:
+            _landing_html[path] = entry[:4] + (now,)
+            _landing_html.move_to_end(path)
+            return entry[1:4]
+
+    with open(path, "rb") as f:
+        body = f.read()
+    entry = (mtime_ns, body, gzip.compress(body), hashlib.sha256(body).hexdigest()[:32], now)
+
+    with _landing_html_lock:
+        previous = _landing_html.pop(path, None)
+        if previous is not None:
+            _landing_html_size -= len(previous[1]) + len(previous[2])
+        _landing_html[path] = entry
+        _landing_html_size += len(body) + len(entry[2])
+        while _landing_html_size > LANDING_HTML_CACHE_BYTES and len(_landing_html) > 1:
+            _, evicted = _landing_html.popitem(last=False)
+            _landing_html_size -= len(evicted[1]) + len(evicted[2])
+    return entry[1:4]
+
+
+def send_landing_html(path: str) -> Response:
+    """Send a cached HTML file, gzipped if accepted, answering 304 on a matching ETag."""
+    try:
+        body, body_gz, etag = load_cached_html(path)
+    except OSError:
+        abort(404)
+
+    response = Response(body, mimetype="text/html")
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings["gzip"]:
+        response.set_data(body_gz)
+        response.headers["Content-Encoding"] = "gzip"
+        etag += "-gz"
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+# Content-hashed asset names (e.g. "app-3f9a2c7e.js") never change content, so
+# browsers and intermediaries may keep them for a year without revalidating.
+# The hash must contain a hex letter: all-digit suffixes are usually dates
+# ("IMG-20231005.jpg") and such files are replaced under the same name
+_HASHED_ASSET = re.compile(r"[-.](?=[0-9]*[a-f])[0-9a-f]{8,}\.[a-z0-9]+$", re.IGNORECASE)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Other assets keep their name across redeployments: cache them briefly, then
+# revalidate against the ETag
+ASSET_MAX_AGE = int(os.getenv("ASSET_MAX_AGE", "300"))
+
+
+def landing_file_cache_control(filename: str) -> str | None:
+    """
+    Cache-Control for a landing page file, or None to leave the default
+    (revalidate on every use).
+
+    HTML is "no-cache": every visit must reach the server to be tracked, but
+    may still be answered 304 from the ETag.
+    """
+    if filename.endswith(".html"):
+        return "no-cache"
+    if _HASHED_ASSET.search(filename):
+        return IMMUTABLE_CACHE_CONTROL
+    if ASSET_MAX_AGE > 0:
+        return f"public, max-age={ASSET_MAX_AGE}"
     return None
 
 
+def send_landing_file(directory: Path, filename: str) -> Response:
+    """
+    Send a file from a resolved landing page directory.
+
+    Files are handed to the reverse proxy with an X-Accel-Redirect header when
+    ACCEL_REDIRECT is on, so Python never reads them; the proxy answers 404
+    for missing files and copies Cache-Control.
+    Otherwise HTML pages come from the in-process cache and other files go
+    through send_from_directory().
+    """
+    path = safe_join(str(directory), filename)
+    if path is None:
+        abort(404)
+
+    response = None
+    if ACCEL_REDIRECT:
+        for root, prefix in ACCEL_REDIRECT_ROOTS:
+            try:
+                relpath = Path(path).relative_to(root)
+            except ValueError:
+                continue
+            response = Response(headers={"X-Accel-Redirect": prefix + relpath.as_posix()})
+            break
+
+    if response is None:
+        if filename.endswith(".html"):
+            response = send_landing_html(path)
+        else:
+            response = send_from_directory(directory, filename)
+
+    cache_control = landing_file_cache_control(filename)
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
 # ============================================
 # Routes
 # ============================================
@@ -268,6 +470,7 @@ def health_check():
         return jsonify({
             "status": "healthy" if db_connected else "degraded",
             "database": "connected" if db_connected else "disconnected",
+            "pool": db_manager.pool_status(),
             "cache_dir": str(CACHE_DIR),
             "cache_exists": CACHE_DIR.exists(),
         })
@@ -275,6 +478,20 @@ def health_check():
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
 
 
+# 1x1 transparent GIF served by the open-tracking pixel. Not cacheable: every
+# fetch has to reach the server to be counted
+PIXEL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff"
+    b"\x00\x00\x00\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00"
+    b"\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00\x3b"
+)
+PIXEL_HEADERS = {
+    "Content-Type": "image/gif",
+    "Content-Length": str(len(PIXEL_GIF)),
+    "Cache-Control": "no-store",
+}
+
+
 @app.route("/track/open")
 def track_email_open():
     """
@@ -283,47 +500,46 @@ def track_email_open():
     Returns a 1x1 transparent GIF.
     """
     token = request.args.get("t")
+    if not token:
+        # Scanners fetching the bare pixel URL: nothing to record
+        return PIXEL_GIF, 200, PIXEL_HEADERS
+
     ip_address = get_client_ip()
-    user_agent = request.headers.get("User-Agent", "")
-    ua_info = parse_user_agent(user_agent)
+    user_agent = get_user_agent()
 
-    if token:
+    # Mail clients and image proxies refetch the pixel; repeats within the
+    # dedup window skip the database entirely
+    if should_record(token, "email_opened", ip_address):
         try:
             with db_manager.get_session() as session:
                 campaign_target = get_campaign_target_by_token(session, token)
 
                 if campaign_target:
                     # Log email_opened event
-                    log_event(
-                        session,
+                    queue_event(
                         campaign_target_id=campaign_target.id,
                         event_type_name="email_opened",
                         ip_address=ip_address,
                         user_agent=user_agent,
-                        browser=ua_info["browser"],
-                        os_name=ua_info["os"],
-                        device_type=ua_info["device_type"],
+                        new_status="opened",
                     )
 
-                    # Update status to "opened"
-                    update_campaign_target_status(session, campaign_target.id, "opened")
-
                     logger.info(
-                        f"Email opened: token={token[:8]}... target_id={campaign_target.target_id}"
+                        "Email opened: token=%.8s... target_id=%s",
+                        token, campaign_target.target_id,
                     )
                 else:
-                    logger.warning(f"Invalid tracking token for email open: {token[:8]}...")
+                    logger.warning("Invalid tracking token for email open: %.8s...", token)
 
         except Exception as e:
-            logger.error(f"Error tracking email open: {e}")
+            logger.error("Error tracking email open: %s", e)
 
     # Return 1x1 transparent GIF
-    gif_data = (
-        b"\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff"
-        b"\x00\x00\x00\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00"
-        b"\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00\x3b"
-    )
-    return Response(gif_data, mimetype="image/gif")
+    return PIXEL_GIF, 200, PIXEL_HEADERS
+
+
+# Form field names (lowercased) that mark a submission as captured credentials
+CREDENTIAL_FIELDS = frozenset({"password", "pwd", "pass", "secret"})
 
 
 @app.route("/api/submit", methods=["POST"])
@@ -335,8 +551,7 @@ def handle_form_submission():
     """
     token = request.args.get("t") or request.form.get("t") or request.form.get("_token")
     ip_address = get_client_ip()
-    user_agent = request.headers.get("User-Agent", "")
-    ua_info = parse_user_agent(user_agent)
+    user_agent = get_user_agent()
 
     # Get form data
     if request.is_json:
@@ -353,13 +568,15 @@ def handle_form_submission():
     if token:
         try:
             with db_manager.get_session() as session:
-                campaign_target = get_campaign_target_by_token(session, token)
+                # Stores the submission and marks the target "submitted"
+                campaign_target = record_form_submission(
+                    session, token, ip_address=ip_address, user_agent=user_agent
+                )
 
                 if campaign_target:
                     # Check if credentials were captured
-                    has_credentials = any(
-                        key.lower() in ["password", "pwd", "pass", "secret"]
-                        for key in form_data.keys()
+                    has_credentials = not CREDENTIAL_FIELDS.isdisjoint(
+                        key.lower() for key in form_data
                     )
 
                     event_type = (
@@ -367,71 +584,44 @@ def handle_form_submission():
                     )
 
                     # Log event
-                    log_event(
-                        session,
+                    queue_event(
                         campaign_target_id=campaign_target.id,
                         event_type_name=event_type,
                         ip_address=ip_address,
                         user_agent=user_agent,
-                        browser=ua_info["browser"],
-                        os_name=ua_info["os"],
-                        device_type=ua_info["device_type"],
-                    )
-
-                    # Create form submission record
-                    create_form_submission(
-                        session,
-                        campaign_target_id=campaign_target.id,
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                    )
-
-                    # Update status to "submitted"
-                    update_campaign_target_status(
-                        session, campaign_target.id, "submitted"
                     )
 
                     # Get redirect URL from campaign's landing page
-                    if campaign_target.campaign and campaign_target.campaign.landing_page:
-                        redirect_url = campaign_target.campaign.landing_page.redirect_url
+                    redirect_url = campaign_target.redirect_url
 
                     logger.info(
-                        f"Form submitted: token={token[:8]}... "
-                        f"event={event_type} fields={list(form_data.keys())}"
+                        "Form submitted: token=%.8s... event=%s fields=%s",
+                        token, event_type, list(form_data),
                     )
                 else:
                     # Anonymous submission
-                    log_event(
-                        session,
+                    queue_event(
                         campaign_target_id=None,
                         event_type_name="anonymous_submission",
                         ip_address=ip_address,
                         user_agent=user_agent,
-                        browser=ua_info["browser"],
-                        os_name=ua_info["os"],
-                        device_type=ua_info["device_type"],
                     )
-                    logger.warning(f"Anonymous form submission: invalid token {token[:8]}...")
+                    logger.warning("Anonymous form submission: invalid token %.8s...", token)
 
         except Exception as e:
-            logger.error(f"Error handling form submission: {e}")
+            logger.error("Error handling form submission: %s", e)
 
     else:
         # No token provided
         try:
-            with db_manager.get_session() as session:
-                log_event(
-                    session,
-                    campaign_target_id=None,
-                    event_type_name="anonymous_submission",
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    browser=ua_info["browser"],
-                    os_name=ua_info["os"],
-                    device_type=ua_info["device_type"],
-                )
+            queue_event(
+                campaign_target_id=None,
+                event_type_name="anonymous_submission",
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
         except Exception as e:
-            logger.error(f"Error logging anonymous submission: {e}")
+            logger.error("Error logging anonymous submission: %s", e)
 
     # Redirect to configured URL or return success
     if redirect_url:
@@ -440,6 +630,12 @@ def handle_form_submission():
     return jsonify({"status": "success", "message": "Form received"})
 
 
+# Extensions (lowercase) of files that are never tracked as a page visit
+STATIC_ASSET_EXTENSIONS = frozenset(
+    {"css", "js", "png", "jpg", "jpeg", "gif", "svg", "avif", "ico", "woff", "woff2", "ttf", "eot"}
+)
+
+
 @app.route("/<path:url_path>")
 def serve_landing_page(url_path):
     """
@@ -451,9 +647,6 @@ def serve_landing_page(url_path):
     4. Serve the content with proper MIME type
     """
     token = request.args.get("t")
-    ip_address = get_client_ip()
-    user_agent = request.headers.get("User-Agent", "")
-    ua_info = parse_user_agent(user_agent)
 
     # Try to find cached landing page first
     cache_result = find_cached_landing_page(url_path)
@@ -469,7 +662,7 @@ def serve_landing_page(url_path):
         if "file" in cache_info:
             file_to_serve = cache_info["file"]
             is_html_page = file_to_serve.endswith(".html")
-        elif url_path.endswith((".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".avif", ".ico", ".woff", ".woff2", ".ttf", ".eot")):
+        elif os.path.splitext(url_path)[1][1:].lower() in STATIC_ASSET_EXTENSIONS:
             # This is a static asset, not a landing page
             is_html_page = False
             file_to_serve = url_path.split("/")[-1]  # Get filename
@@ -480,6 +673,9 @@ def serve_landing_page(url_path):
 
         # Track the visit (only for HTML pages, not for static assets)
         if is_html_page:
+            ip_address = get_client_ip()
+            user_agent = get_user_agent()
+
             if token:
                 try:
                     with db_manager.get_session() as session:
@@ -487,107 +683,85 @@ def serve_landing_page(url_path):
 
                         if campaign_target:
                             # Valid token - log link_clicked
-                            log_event(
-                                session,
+                            queue_event(
                                 campaign_target_id=campaign_target.id,
                                 event_type_name="link_clicked",
                                 ip_address=ip_address,
                                 user_agent=user_agent,
-                                browser=ua_info["browser"],
-                                os_name=ua_info["os"],
-                                device_type=ua_info["device_type"],
-                            )
-
-                            # Update status to "clicked"
-                            update_campaign_target_status(
-                                session, campaign_target.id, "clicked"
+                                new_status="clicked",
                             )
 
                             logger.info(
-                                f"Link clicked: token={token[:8]}... "
-                                f"url_path={url_path} target_id={campaign_target.target_id}"
+                                "Link clicked: token=%.8s... url_path=%s target_id=%s",
+                                token, url_path, campaign_target.target_id,
                             )
                         else:
                             # Invalid token
-                            log_event(
-                                session,
+                            queue_event(
                                 campaign_target_id=None,
                                 event_type_name="anonymous_visit",
                                 ip_address=ip_address,
                                 user_agent=user_agent,
-                                browser=ua_info["browser"],
-                                os_name=ua_info["os"],
-                                device_type=ua_info["device_type"],
                             )
                             logger.warning(
-                                f"Anonymous visit (invalid token): url_path={url_path}"
+                                "Anonymous visit (invalid token): url_path=%s", url_path
                             )
 
                 except Exception as e:
-                    logger.error(f"Error tracking link click: {e}")
+                    logger.error("Error tracking link click: %s", e)
 
             else:
                 # No token - anonymous visit
                 try:
-                    with db_manager.get_session() as session:
-                        log_event(
-                            session,
-                            campaign_target_id=None,
-                            event_type_name="anonymous_visit",
-                            ip_address=ip_address,
-                            user_agent=user_agent,
-                            browser=ua_info["browser"],
-                            os_name=ua_info["os"],
-                            device_type=ua_info["device_type"],
-                        )
-                        logger.warning(f"Anonymous visit (no token): url_path={url_path}")
+                    queue_event(
+                        campaign_target_id=None,
+                        event_type_name="anonymous_visit",
+                        ip_address=ip_address,
+                        user_agent=user_agent,
+                    )
+                    logger.warning("Anonymous visit (no token): url_path=%s", url_path)
 
                 except Exception as e:
-                    logger.error(f"Error logging anonymous visit: {e}")
+                    logger.error("Error logging anonymous visit: %s", e)
 
         # Serve the file from the campaign deployment or cache directory
         # Handle nested paths for assets (e.g., "assets/home/style.css")
         if "file" in cache_info:
             # Direct file reference - serve from campaign root
-            return send_from_directory(cache_dir, cache_info["file"])
+            return send_landing_file(cache_dir, cache_info["file"])
         else:
             # Serve index.html or other file
-            return send_from_directory(cache_dir, file_to_serve)
+            return send_landing_file(cache_dir, file_to_serve)
 
     # No cache found - try database lookup
     try:
         with db_manager.get_session() as session:
-            landing_page = get_landing_page_by_url_path(session, url_path)
+            html_content = get_landing_page_html(session, url_path)
 
-            if landing_page:
+            if html_content is not None:
                 # Track the visit (same logic as above)
+                ip_address = get_client_ip()
+                user_agent = get_user_agent()
+
                 if token:
                     campaign_target = get_campaign_target_by_token(session, token)
                     if campaign_target:
-                        log_event(
-                            session,
+                        queue_event(
                             campaign_target_id=campaign_target.id,
                             event_type_name="link_clicked",
                             ip_address=ip_address,
                             user_agent=user_agent,
-                            browser=ua_info["browser"],
-                            os_name=ua_info["os"],
-                            device_type=ua_info["device_type"],
-                        )
-                        update_campaign_target_status(
-                            session, campaign_target.id, "clicked"
+                            new_status="clicked",
                         )
                     else:
-                        log_event(
-                            session,
+                        queue_event(
                             campaign_target_id=None,
                             event_type_name="anonymous_visit",
                             ip_address=ip_address,
                             user_agent=user_agent,
                         )
                 else:
-                    log_event(
-                        session,
+                    queue_event(
                         campaign_target_id=None,
                         event_type_name="anonymous_visit",
                         ip_address=ip_address,
@@ -596,15 +770,15 @@ def serve_landing_page(url_path):
 
                 # Return HTML content directly from database
                 return Response(
-                    landing_page.html_content,
+                    html_content,
                     mimetype="text/html",
                 )
 
     except Exception as e:
-        logger.error(f"Error serving landing page from database: {e}")
+        logger.error("Error serving landing page from database: %s", e)
 
     # Nothing found
-    logger.warning(f"Landing page not found: {url_path}")
+    logger.warning("Landing page not found: %s", url_path)
     abort(404)
 
 
@@ -633,7 +807,7 @@ def not_found(e):
 @app.errorhandler(500)
 def server_error(e):
     """Handle 500 errors."""
-    logger.error(f"Server error: {e}")
+    logger.error("Server error: %s", e)
     return Response(
         "<html><body><h1>Server Error</h1></body></html>",
         status=500,
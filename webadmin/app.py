@@ -51,7 +51,20 @@ def create_app(config=None):
         app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
         app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
             "pool_pre_ping": True,  # Verify connections before using
-            "pool_recycle": 300,  # Recycle connections after 5 minutes
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_recycle": 1800,  # Recycle connections after 30 minutes
+            # libpq TCP keepalives so a dead peer is noticed in ~1 minute
+            "connect_args": {
+                "keepalives": 1,
+                "keepalives_idle": 30,
+                "keepalives_interval": 10,
+                "keepalives_count": 3,
+            },
+            # Fold executemany INSERTs into multi-row VALUES pages and batch UPDATE/DELETE
+            "executemany_mode": "values_plus_batch",
+            "insertmanyvalues_page_size": 1000,
+            "executemany_batch_page_size": 500,
         }
         db_display = database_url.split("@")[1] if "@" in database_url else "configured"
         print(f"✅ Database configured: {db_display}")
@@ -306,6 +319,13 @@ if __name__ == "__main__":
 
     app = create_app()
 
+    # Under gunicorn this is started by gunicorn.conf.py; with the reloader,
+    # only in the child process that serves requests
+    if not is_debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        from utils.partition_maintenance import start_partition_maintenance
+
+        start_partition_maintenance(app)
+
     print("\n" + "=" * 70)
     print(f"🚀 Phishly WebAdmin starting on http://0.0.0.0:{port}")
     print(f"   Debug Mode: {'ENABLED' if is_debug else 'DISABLED'}")
@@ -5,6 +5,7 @@ import click
 from flask.cli import with_appcontext
 from database import db
 from db.models import AdminUser
+from db.partitions import DEFAULT_MONTHS_AHEAD, ensure_event_partitions
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
@@ -53,6 +54,17 @@ def init_db_command():
         click.echo("Admin user already exists.")
 
 
+@click.command("ensure-event-partitions")
+@click.option("--months-ahead", default=DEFAULT_MONTHS_AHEAD, show_default=True)
+@with_appcontext
+def ensure_event_partitions_command(months_ahead):
+    """Create the monthly events partitions through the coming months."""
+    with db.engine.begin() as connection:
+        names = ensure_event_partitions(connection, months_ahead=months_ahead)
+    click.echo(f"✅ Event partitions present: {', '.join(names)}")
+
+
 def register_commands(app):
     """Register CLI commands with Flask app"""
     app.cli.add_command(init_db_command)
+    app.cli.add_command(ensure_event_partitions_command)
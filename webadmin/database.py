@@ -38,6 +38,8 @@ from db.models import (  # noqa: E402, F401
     FormQuestion,
     FormSubmission,
     FormAnswer,
+    EVENT_TYPE_IDS,
+    load_event_type_ids,
 )
 
 # Configure logging
@@ -62,6 +64,7 @@ def get_or_create_event_type(name, description=None):
         event_type = EventType(name=name, description=description)
         db.session.add(event_type)
         db.session.commit()
+        EVENT_TYPE_IDS[name] = event_type.id
         logger.info(f"Created new event type: {name}")
 
     return event_type
@@ -69,7 +72,9 @@ def get_or_create_event_type(name, description=None):
 
 def get_event_type_id(name):
     """
-    Get event type ID by name (faster than loading full object).
+    Get event type ID by name from the process-wide cache.
+
+    The cache is (re)loaded from the database on a miss.
 
     Args:
         name: Event type name
@@ -77,10 +82,9 @@ def get_event_type_id(name):
     Returns:
         Event type ID or None if not found
     """
-    event_type = (
-        db.session.query(EventType.id).filter_by(name=name).first()
-    )
-    return event_type[0] if event_type else None
+    if name not in EVENT_TYPE_IDS:
+        load_event_type_ids(db.session)
+    return EVENT_TYPE_IDS.get(name)
 
 
 def init_event_types():
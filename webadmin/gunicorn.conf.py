@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for the Phishly WebAdmin (production image).
+
+Background jobs of the served app are started here rather than in
+create_app(), which also runs for alembic, `flask` CLI commands and scripts.
+"""
+
+bind = "0.0.0.0:8006"
+workers = 4
+timeout = 120
+accesslog = "-"
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    """Start the served app's background jobs once the worker has loaded it."""
+    from utils.partition_maintenance import start_partition_maintenance
+
+    start_partition_maintenance(worker.wsgi)
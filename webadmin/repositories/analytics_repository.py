@@ -640,7 +640,6 @@ class AnalyticsRepository(BaseRepository):
                     Event.id,
                     Event.created_at,
                     Event.ip_address,
-                    Event.user_agent,
                     EventType.name.label("event_type"),
                     Campaign.name.label("campaign_name"),
                     Target.email.label("target_email"),
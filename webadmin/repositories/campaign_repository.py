@@ -8,15 +8,20 @@ from repositories.base_repository import BaseRepository
 from database import db, get_event_type_id
 from db.models import (
     Campaign,
+    CampaignEventCount,
     CampaignTarget,
     CampaignTargetList,
     EmailJob,
     EmailTemplate,
     TargetList,
     TargetListMember,
-    Event,
+    new_tracking_token,
 )
 from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from db.bulk import bulk_insert
+from db.pg_copy import copy_rows
+from db.loading import strict
 from datetime import datetime
 import logging
 
@@ -57,38 +62,12 @@ class CampaignRepository(BaseRepository):
             event_clicked_id = get_event_type_id("link_clicked")
             event_submitted_id = get_event_type_id("form_submitted")
 
-            # Count events by type
-            emails_sent = (
-                db.session.query(func.count(Event.id))
-                .filter(Event.event_type_id == event_sent_id)
-                .scalar()
-                if event_sent_id
-                else 0
-            )
-
-            emails_opened = (
-                db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                .filter(Event.event_type_id == event_opened_id)
-                .scalar()
-                if event_opened_id
-                else 0
-            )
-
-            links_clicked = (
-                db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                .filter(Event.event_type_id == event_clicked_id)
-                .scalar()
-                if event_clicked_id
-                else 0
-            )
-
-            credentials_submitted = (
-                db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                .filter(Event.event_type_id == event_submitted_id)
-                .scalar()
-                if event_submitted_id
-                else 0
-            )
+            # Event totals by type, summed from the per-campaign counters
+            totals = CampaignRepository._event_totals_by_type()
+            emails_sent = totals.get(event_sent_id, (0, 0))[0]
+            emails_opened = totals.get(event_opened_id, (0, 0))[1]
+            links_clicked = totals.get(event_clicked_id, (0, 0))[1]
+            credentials_submitted = totals.get(event_submitted_id, (0, 0))[1]
 
             # Calculate rates
             open_rate = round((emails_opened / emails_sent * 100), 1) if emails_sent > 0 else 0.0
@@ -126,6 +105,52 @@ class CampaignRepository(BaseRepository):
                 "submission_rate": 0.0,
             }
 
+    @staticmethod
+    def _event_totals_by_type():
+        """
+        Sum the trigger-maintained campaign counters per event type.
+
+        Returns:
+            dict: event_type_id -> (event_count, target_count)
+        """
+        rows = (
+            db.session.query(
+                CampaignEventCount.event_type_id,
+                func.sum(CampaignEventCount.event_count),
+                func.sum(CampaignEventCount.target_count),
+            )
+            .group_by(CampaignEventCount.event_type_id)
+            .all()
+        )
+        return {
+            event_type_id: (int(event_count or 0), int(target_count or 0))
+            for event_type_id, event_count, target_count in rows
+        }
+
+    @staticmethod
+    def _target_counts(campaign_ids):
+        """
+        Load distinct-target event counts for several campaigns in one query.
+
+        Args:
+            campaign_ids: Campaign IDs to load
+
+        Returns:
+            dict: (campaign_id, event_type_id) -> number of distinct targets
+        """
+        if not campaign_ids:
+            return {}
+        rows = (
+            db.session.query(
+                CampaignEventCount.campaign_id,
+                CampaignEventCount.event_type_id,
+                CampaignEventCount.target_count,
+            )
+            .filter(CampaignEventCount.campaign_id.in_(campaign_ids))
+            .all()
+        )
+        return {(campaign_id, event_type_id): count for campaign_id, event_type_id, count in rows}
+
     @staticmethod
     def get_recent_campaigns(limit=5):
         """
@@ -138,10 +163,17 @@ class CampaignRepository(BaseRepository):
             list: Recent campaigns with stats
         """
         try:
-            campaigns = db.session.query(Campaign).order_by(Campaign.created_at.desc()).limit(limit).all()
+            # Counts are aggregated below; no relationships are needed
+            campaigns = (
+                strict(db.session.query(Campaign))
+                .order_by(Campaign.created_at.desc())
+                .limit(limit)
+                .all()
+            )
 
             event_opened_id = get_event_type_id("email_opened")
             event_clicked_id = get_event_type_id("link_clicked")
+            target_counts = CampaignRepository._target_counts([c.id for c in campaigns])
 
             result = []
             for c in campaigns:
@@ -153,27 +185,8 @@ class CampaignRepository(BaseRepository):
                     or 0
                 )
 
-                # Count opened events for this campaign
-                opened = (
-                    db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                    .join(CampaignTarget, Event.campaign_target_id == CampaignTarget.id)
-                    .filter(CampaignTarget.campaign_id == c.id)
-                    .filter(Event.event_type_id == event_opened_id)
-                    .scalar()
-                    if event_opened_id
-                    else 0
-                )
-
-                # Count clicked events for this campaign
-                clicked = (
-                    db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                    .join(CampaignTarget, Event.campaign_target_id == CampaignTarget.id)
-                    .filter(CampaignTarget.campaign_id == c.id)
-                    .filter(Event.event_type_id == event_clicked_id)
-                    .scalar()
-                    if event_clicked_id
-                    else 0
-                )
+                opened = target_counts.get((c.id, event_opened_id), 0)
+                clicked = target_counts.get((c.id, event_clicked_id), 0)
 
                 result.append(
                     {
@@ -202,10 +215,18 @@ class CampaignRepository(BaseRepository):
             list: All campaigns with template name, group name, and metrics
         """
         try:
-            campaigns = db.session.query(Campaign).all()
+            # Counts are aggregated below; only the template and list names are loaded
+            campaigns = strict(
+                db.session.query(Campaign),
+                selectinload(Campaign.email_template),
+                selectinload(Campaign.campaign_target_lists)
+                .selectinload(CampaignTargetList.target_list)
+                .raiseload("*"),
+            ).all()
 
             event_opened_id = get_event_type_id("email_opened")
             event_clicked_id = get_event_type_id("link_clicked")
+            target_counts = CampaignRepository._target_counts([c.id for c in campaigns])
 
             result = []
             for c in campaigns:
@@ -237,27 +258,9 @@ class CampaignRepository(BaseRepository):
                     or 0
                 )
 
-                # Count opened
-                opened = (
-                    db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                    .join(CampaignTarget, Event.campaign_target_id == CampaignTarget.id)
-                    .filter(CampaignTarget.campaign_id == c.id)
-                    .filter(Event.event_type_id == event_opened_id)
-                    .scalar()
-                    if event_opened_id
-                    else 0
-                )
-
-                # Count clicked
-                clicked = (
-                    db.session.query(func.count(func.distinct(Event.campaign_target_id)))
-                    .join(CampaignTarget, Event.campaign_target_id == CampaignTarget.id)
-                    .filter(CampaignTarget.campaign_id == c.id)
-                    .filter(Event.event_type_id == event_clicked_id)
-                    .scalar()
-                    if event_clicked_id
-                    else 0
-                )
+                # Distinct targets that opened / clicked
+                opened = target_counts.get((c.id, event_opened_id), 0)
+                clicked = target_counts.get((c.id, event_clicked_id), 0)
 
                 result.append(
                     {
@@ -424,42 +427,35 @@ class CampaignRepository(BaseRepository):
             db.session.add(new_campaign)
             db.session.flush()  # Get ID without committing
 
-            # Link target lists to campaign and create individual campaign targets
-            targets_added = 0
-            for target_list_id in target_list_ids:
-                # Link the target list to campaign
-                campaign_target_list = CampaignTargetList(
-                    campaign_id=new_campaign.id, target_list_id=target_list_id
-                )
-                db.session.add(campaign_target_list)
-
-                # Get all targets from this list
-                target_members = (
-                    db.session.query(TargetListMember)
-                    .filter(TargetListMember.target_list_id == target_list_id)
-                    .all()
-                )
+            # Link target lists to campaign
+            bulk_insert(
+                db.session,
+                CampaignTargetList,
+                [
+                    {"campaign_id": new_campaign.id, "target_list_id": target_list_id}
+                    for target_list_id in target_list_ids
+                ],
+            )
 
-                # Create CampaignTarget entry for each target
-                for member in target_members:
-                    # Check if this target is already added (avoid duplicates if in multiple lists)
-                    existing = (
-                        db.session.query(CampaignTarget)
-                        .filter(
-                            CampaignTarget.campaign_id == new_campaign.id,
-                            CampaignTarget.target_id == member.target_id,
-                        )
-                        .first()
-                    )
-
-                    if not existing:
-                        campaign_target = CampaignTarget(
-                            campaign_id=new_campaign.id,
-                            target_id=member.target_id,
-                            status="pending",
-                        )
-                        db.session.add(campaign_target)
-                        targets_added += 1
+            # Create one CampaignTarget per distinct target across all lists,
+            # with its tracking token assigned up front. Lists can hold tens of
+            # thousands of targets, so the rows are streamed in with COPY
+            target_ids = [
+                target_id
+                for (target_id,) in db.session.query(TargetListMember.target_id)
+                .filter(TargetListMember.target_list_id.in_(target_list_ids))
+                .distinct()
+                .order_by(TargetListMember.target_id)
+            ]
+            targets_added = copy_rows(
+                db.session,
+                CampaignTarget,
+                ["campaign_id", "target_id", "status", "tracking_token"],
+                (
+                    (new_campaign.id, target_id, "pending", new_tracking_token())
+                    for target_id in target_ids
+                ),
+            )
 
             # Commit all changes
             db.session.commit()
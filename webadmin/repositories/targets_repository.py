@@ -7,6 +7,7 @@ Handles all target group and target-related database queries for the webadmin
 from repositories.base_repository import BaseRepository
 from database import db
 from db.models import TargetList, TargetListMember, Target, Department, AdminUser
+from db.pg_copy import copy_rows
 from sqlalchemy import func
 from datetime import datetime
 import logging
@@ -205,74 +206,14 @@ class TargetsRepository(BaseRepository):
             db.session.add(new_target_list)
             db.session.flush()  # Get ID without committing
 
-            # Process targets
-            for target_data in targets_list:
-                # Check if target exists by email
-                existing_target = (
-                    db.session.query(Target).filter(Target.email == target_data["email"]).first()
-                )
-
-                if existing_target:
-                    # Update existing target with new data (if provided)
-                    if target_data.get("first_name"):
-                        existing_target.first_name = target_data["first_name"]
-                    if target_data.get("last_name"):
-                        existing_target.last_name = target_data["last_name"]
-                    if target_data.get("position"):
-                        existing_target.position = target_data["position"]
-                    if target_data.get("salutation"):
-                        existing_target.salutation = target_data["salutation"]
-
-                    # Update department
-                    dept_name = target_data.get("department", "").strip()
-                    if dept_name:
-                        dept = (
-                            db.session.query(Department)
-                            .filter(Department.name == dept_name)
-                            .first()
-                        )
-                        if not dept:
-                            dept = Department(name=dept_name)
-                            db.session.add(dept)
-                            db.session.flush()
-                        existing_target.department_id = dept.id
-
-                    target_id = existing_target.id
-                else:
-                    # Get or create department
-                    dept_name = target_data.get("department", "").strip()
-                    department_id = None
-
-                    if dept_name:
-                        dept = (
-                            db.session.query(Department)
-                            .filter(Department.name == dept_name)
-                            .first()
-                        )
-                        if not dept:
-                            dept = Department(name=dept_name)
-                            db.session.add(dept)
-                            db.session.flush()
-                        department_id = dept.id
-
-                    # Create new target
-                    new_target = Target(
-                        email=target_data["email"],
-                        salutation=target_data.get("salutation", ""),
-                        first_name=target_data.get("first_name", ""),
-                        last_name=target_data.get("last_name", ""),
-                        position=target_data.get("position", ""),
-                        department_id=department_id,
-                    )
-                    db.session.add(new_target)
-                    db.session.flush()
-                    target_id = new_target.id
-
-                # Add to target list
-                membership = TargetListMember(
-                    target_list_id=new_target_list.id, target_id=target_id
-                )
-                db.session.add(membership)
+            # Resolve targets, then stream all memberships in one COPY
+            target_ids = TargetsRepository._resolve_target_ids(targets_list)
+            copy_rows(
+                db.session,
+                TargetListMember,
+                ["target_list_id", "target_id"],
+                ((new_target_list.id, target_id) for target_id in target_ids),
+            )
 
             # Commit all changes
             db.session.commit()
@@ -292,6 +233,89 @@ class TargetsRepository(BaseRepository):
             logger.error(f"Error creating group: {e}")
             return None
 
+    @staticmethod
+    def _resolve_target_ids(targets_list):
+        """
+        Update existing targets and bulk-insert new ones for a group import
+
+        Existing targets are looked up by email in a single query; new targets
+        are streamed in with COPY. Emails are matched case-insensitively, so
+        addresses repeated within the import (in any case) are merged.
+
+        Args:
+            targets_list: List of target dictionaries with email, first_name, last_name, etc.
+
+        Returns:
+            list: Target IDs in import order, without duplicates
+        """
+        emails = list(dict.fromkeys(t["email"].lower() for t in targets_list))
+        existing = {
+            t.email.lower(): t
+            for t in db.session.query(Target).filter(func.lower(Target.email).in_(emails)).all()
+        }
+
+        departments = {}
+
+        def department_id_for(target_data):
+            # Get or create department, caching lookups for the whole import
+            dept_name = target_data.get("department", "").strip()
+            if not dept_name:
+                return None
+            if dept_name not in departments:
+                dept = db.session.query(Department).filter(Department.name == dept_name).first()
+                if not dept:
+                    dept = Department(name=dept_name)
+                    db.session.add(dept)
+                    db.session.flush()
+                departments[dept_name] = dept.id
+            return departments[dept_name]
+
+        new_targets = {}
+        for target_data in targets_list:
+            email = target_data["email"].lower()
+            existing_target = existing.get(email)
+
+            if existing_target:
+                # Update existing target with new data (if provided)
+                if target_data.get("first_name"):
+                    existing_target.first_name = target_data["first_name"]
+                if target_data.get("last_name"):
+                    existing_target.last_name = target_data["last_name"]
+                if target_data.get("position"):
+                    existing_target.position = target_data["position"]
+                if target_data.get("salutation"):
+                    existing_target.salutation = target_data["salutation"]
+
+                department_id = department_id_for(target_data)
+                if department_id:
+                    existing_target.department_id = department_id
+            elif email not in new_targets:
+                # Stored as first written; only the lookup key is lowercased
+                new_targets[email] = (
+                    target_data["email"],
+                    target_data.get("salutation", ""),
+                    target_data.get("first_name", ""),
+                    target_data.get("last_name", ""),
+                    target_data.get("position", ""),
+                    department_id_for(target_data),
+                )
+
+        ids_by_email = {email: t.id for email, t in existing.items()}
+        if new_targets:
+            copy_rows(
+                db.session,
+                Target,
+                ["email", "salutation", "first_name", "last_name", "position", "department_id"],
+                new_targets.values(),
+            )
+            ids_by_email.update(
+                db.session.query(func.lower(Target.email), Target.id)
+                .filter(func.lower(Target.email).in_(list(new_targets)))
+                .all()
+            )
+
+        return [ids_by_email[email] for email in emails]
+
     @staticmethod
     def parse_csv_targets(csv_content):
         """
@@ -512,73 +536,13 @@ class TargetsRepository(BaseRepository):
             ).delete()
 
             # Add new memberships
-            for target_data in targets_list:
-                # Check if target exists by email
-                existing_target = (
-                    db.session.query(Target).filter(Target.email == target_data["email"]).first()
-                )
-
-                if existing_target:
-                    # Update existing target with new data (if provided)
-                    if target_data.get("first_name"):
-                        existing_target.first_name = target_data["first_name"]
-                    if target_data.get("last_name"):
-                        existing_target.last_name = target_data["last_name"]
-                    if target_data.get("position"):
-                        existing_target.position = target_data["position"]
-                    if target_data.get("salutation"):
-                        existing_target.salutation = target_data["salutation"]
-
-                    # Update department
-                    dept_name = target_data.get("department", "").strip()
-                    if dept_name:
-                        dept = (
-                            db.session.query(Department)
-                            .filter(Department.name == dept_name)
-                            .first()
-                        )
-                        if not dept:
-                            dept = Department(name=dept_name)
-                            db.session.add(dept)
-                            db.session.flush()
-                        existing_target.department_id = dept.id
-
-                    target_id = existing_target.id
-                else:
-                    # Get or create department
-                    dept_name = target_data.get("department", "").strip()
-                    department_id = None
-
-                    if dept_name:
-                        dept = (
-                            db.session.query(Department)
-                            .filter(Department.name == dept_name)
-                            .first()
-                        )
-                        if not dept:
-                            dept = Department(name=dept_name)
-                            db.session.add(dept)
-                            db.session.flush()
-                        department_id = dept.id
-
-                    # Create new target
-                    new_target = Target(
-                        email=target_data["email"],
-                        salutation=target_data.get("salutation", ""),
-                        first_name=target_data.get("first_name", ""),
-                        last_name=target_data.get("last_name", ""),
-                        position=target_data.get("position", ""),
-                        department_id=department_id,
-                    )
-                    db.session.add(new_target)
-                    db.session.flush()
-                    target_id = new_target.id
-
-                # Add to target list
-                membership = TargetListMember(
-                    target_list_id=group_id, target_id=target_id
-                )
-                db.session.add(membership)
+            target_ids = TargetsRepository._resolve_target_ids(targets_list)
+            copy_rows(
+                db.session,
+                TargetListMember,
+                ["target_list_id", "target_id"],
+                ((group_id, target_id) for target_id in target_ids),
+            )
 
             db.session.commit()
 
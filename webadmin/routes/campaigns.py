@@ -6,7 +6,11 @@ from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
 from repositories.campaign_repository import CampaignRepository
 from database import db
-from db.models import Campaign, CampaignTarget, EmailJob, Target
+from db.models import Campaign, CampaignTarget, EmailJob, Target, new_tracking_token
+from db.bulk import bulk_update
+from db.loading import strict
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 from datetime import datetime, timedelta
 from celery import Celery
 import os
@@ -52,11 +56,10 @@ def revoke_campaign_tasks(campaign_id):
 
     try:
         # Get all campaign targets for this campaign
-        campaign_targets = db.session.query(CampaignTarget).filter_by(
-            campaign_id=campaign_id
-        ).all()
-
-        campaign_target_ids = [ct.id for ct in campaign_targets]
+        campaign_target_ids = [
+            ct_id
+            for (ct_id,) in db.session.query(CampaignTarget.id).filter_by(campaign_id=campaign_id)
+        ]
 
         if not campaign_target_ids:
             return 0
@@ -249,7 +252,9 @@ def launch_campaign(campaign_id):
             return jsonify({"success": False, "message": "Campaign is already active"}), 400
 
         # Get all targets for this campaign
-        campaign_targets = db.session.query(CampaignTarget).filter_by(campaign_id=campaign_id).all()
+        campaign_targets = strict(
+            db.session.query(CampaignTarget).filter_by(campaign_id=campaign_id)
+        ).all()
 
         if not campaign_targets:
             return jsonify({"success": False, "message": "Campaign has no targets"}), 400
@@ -318,6 +323,18 @@ def launch_campaign(campaign_id):
             else:
                 logger.warning(f"Failed to activate landing page for campaign {campaign_id}: {activation_msg}")
 
+        # Targets created before tokens were assigned at creation get theirs now,
+        # in batched UPDATEs rather than one per email in the worker
+        bulk_update(
+            db.session,
+            CampaignTarget,
+            [
+                {"id": ct.id, "tracking_token": new_tracking_token()}
+                for ct in campaign_targets
+                if not ct.tracking_token
+            ],
+        )
+
         # Update campaign status
         campaign.status = "active"
         campaign.start_date = datetime.utcnow()
@@ -326,7 +343,9 @@ def launch_campaign(campaign_id):
         min_delay = campaign.min_email_delay or 0
         max_delay = campaign.max_email_delay or 0
 
-        # Create email jobs and trigger Celery tasks
+        # Create email jobs and trigger Celery tasks. Job rows are collected as
+        # plain mappings and inserted in one batch before the commit.
+        email_jobs = []
         jobs_created = 0
         tasks_queued = 0
         cumulative_delay = 0  # Track total delay for sequential scheduling
@@ -357,15 +376,15 @@ def launch_campaign(campaign_id):
                     task_id = generate_task_id(campaign_id, target.id)
 
                     # Create email job record with task ID
-                    email_job = EmailJob(
-                        campaign_target_id=campaign_target.id,
-                        celery_task_id=task_id,
-                        status="queued",
-                        scheduled_at=scheduled_time,
-                        delay_seconds=delay_seconds,
+                    email_jobs.append(
+                        {
+                            "campaign_target_id": campaign_target.id,
+                            "celery_task_id": task_id,
+                            "status": "queued",
+                            "scheduled_at": scheduled_time,
+                            "delay_seconds": delay_seconds,
+                        }
                     )
-                    db.session.add(email_job)
-                    db.session.flush()  # Get the email_job.id
                     jobs_created += 1
 
                     # Queue the task asynchronously with custom task_id and countdown
@@ -387,23 +406,26 @@ def launch_campaign(campaign_id):
                 else:
                     logger.warning(f"Target {campaign_target.target_id} not found, skipping")
                     # Create a failed job record
-                    email_job = EmailJob(
-                        campaign_target_id=campaign_target.id,
-                        status="failed",
-                        error_message="Target not found",
+                    email_jobs.append(
+                        {
+                            "campaign_target_id": campaign_target.id,
+                            "status": "failed",
+                            "error_message": "Target not found",
+                        }
                     )
-                    db.session.add(email_job)
 
             except Exception as task_error:
                 logger.error(f"Error queuing Celery task: {task_error}")
                 # Create a failed job record
-                email_job = EmailJob(
-                    campaign_target_id=campaign_target.id,
-                    status="failed",
-                    error_message=str(task_error),
+                email_jobs.append(
+                    {
+                        "campaign_target_id": campaign_target.id,
+                        "status": "failed",
+                        "error_message": str(task_error),
+                    }
                 )
-                db.session.add(email_job)
 
+        db.session.bulk_insert_mappings(EmailJob, email_jobs)
         db.session.commit()
 
         success_msg = (
@@ -581,7 +603,17 @@ def get_campaign_details(campaign_id):
     Get detailed campaign information including template and targets with email status
     """
     try:
-        campaign = db.session.get(Campaign, campaign_id)
+        campaign = db.session.execute(
+            strict(
+                select(Campaign).where(Campaign.id == campaign_id),
+                joinedload(Campaign.email_template),
+                selectinload(Campaign.campaign_targets).options(
+                    joinedload(CampaignTarget.target),
+                    selectinload(CampaignTarget.email_jobs),
+                    raiseload("*"),
+                ),
+            )
+        ).unique().scalar_one_or_none()
 
         if not campaign:
             return jsonify({"success": False, "message": "Campaign not found"}), 404
@@ -18,6 +18,8 @@ from pathlib import Path
 import re
 import argparse
 
+from sqlalchemy.orm import undefer_group
+
 # Add parent directory to Python path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -154,8 +156,8 @@ def main():
         print(f"Templates directory: {templates_dir} (would be created if needed)")
     print()
 
-    # Query all landing pages
-    landing_pages = db.session.query(LandingPage).all()
+    # Query all landing pages, with their (deferred) content in the same query
+    landing_pages = db.session.query(LandingPage).options(undefer_group("content")).all()
 
     if not landing_pages:
         print("No landing pages found in database.")
@@ -242,9 +242,13 @@ def seed_target_lists(targets, departments):
 
         # Add targets from this department
         dept_targets = [t for t in targets if t.department_id == dept.id]
-        for target in dept_targets[:10]:  # Max 10 per list
-            membership = TargetListMember(target_list_id=target_list.id, target_id=target.id)
-            db.session.add(membership)
+        db.session.bulk_insert_mappings(
+            TargetListMember,
+            [
+                {"target_list_id": target_list.id, "target_id": target.id}
+                for target in dept_targets[:10]  # Max 10 per list
+            ],
+        )
 
         target_lists.append(target_list)
         print(f"  ✓ Created target list: {list_name} ({len(dept_targets[:10])} members)")
@@ -302,15 +306,16 @@ def seed_campaigns(templates, target_lists):
             .all()
         )
 
-        # Create campaign targets and events
-        for member in members:
-            campaign_target = CampaignTarget(
-                campaign_id=campaign.id, target_id=member.target_id, status="sent"
-            )
-            db.session.add(campaign_target)
-            db.session.flush()
+        # Create campaign targets in one batch; return_defaults fills in their ids
+        campaign_targets = [
+            {"campaign_id": campaign.id, "target_id": member.target_id, "status": "sent"}
+            for member in members
+        ]
+        db.session.bulk_insert_mappings(CampaignTarget, campaign_targets, return_defaults=True)
 
-            # Create events for this target
+        # Create events for each target, also inserted in one batch
+        events = []
+        for campaign_target in campaign_targets:
             base_time = start_date + timedelta(hours=random.randint(1, 48))
 
             # Email sent (always happens)
@@ -318,43 +323,50 @@ def seed_campaigns(templates, target_lists):
                 f"{random.randint(1, 255)}.{random.randint(1, 255)}."
                 f"{random.randint(1, 255)}.{random.randint(1, 255)}"
             )
-            event_sent = Event(
-                campaign_target_id=campaign_target.id,
-                event_type_id=event_types["email_sent"],
-                created_at=base_time,
-                ip_address=ip_address,
+            events.append(
+                {
+                    "campaign_target_id": campaign_target["id"],
+                    "event_type_id": event_types["email_sent"],
+                    "created_at": base_time,
+                    "ip_address": ip_address,
+                }
             )
-            db.session.add(event_sent)
 
             # Email opened (60% chance)
             if random.random() < 0.6:
-                event_opened = Event(
-                    campaign_target_id=campaign_target.id,
-                    event_type_id=event_types["email_opened"],
-                    created_at=base_time + timedelta(minutes=random.randint(5, 300)),
-                    ip_address=event_sent.ip_address,
+                events.append(
+                    {
+                        "campaign_target_id": campaign_target["id"],
+                        "event_type_id": event_types["email_opened"],
+                        "created_at": base_time + timedelta(minutes=random.randint(5, 300)),
+                        "ip_address": ip_address,
+                    }
                 )
-                db.session.add(event_opened)
 
                 # Link clicked (40% of those who opened)
                 if random.random() < 0.4:
-                    event_clicked = Event(
-                        campaign_target_id=campaign_target.id,
-                        event_type_id=event_types["link_clicked"],
-                        created_at=base_time + timedelta(minutes=random.randint(10, 320)),
-                        ip_address=event_sent.ip_address,
+                    events.append(
+                        {
+                            "campaign_target_id": campaign_target["id"],
+                            "event_type_id": event_types["link_clicked"],
+                            "created_at": base_time + timedelta(minutes=random.randint(10, 320)),
+                            "ip_address": ip_address,
+                        }
                     )
-                    db.session.add(event_clicked)
 
                     # Form submitted (50% of those who clicked)
                     if random.random() < 0.5:
-                        event_submitted = Event(
-                            campaign_target_id=campaign_target.id,
-                            event_type_id=event_types["form_submitted"],
-                            created_at=base_time + timedelta(minutes=random.randint(15, 330)),
-                            ip_address=event_sent.ip_address,
+                        events.append(
+                            {
+                                "campaign_target_id": campaign_target["id"],
+                                "event_type_id": event_types["form_submitted"],
+                                "created_at": base_time
+                                + timedelta(minutes=random.randint(15, 330)),
+                                "ip_address": ip_address,
+                            }
                         )
-                        db.session.add(event_submitted)
+
+        db.session.bulk_insert_mappings(Event, events)
 
         print(f"  ✓ Created campaign: {name} ({len(members)} targets)")
 
@@ -4,6 +4,8 @@ Campaign Deployment Utilities
 Handles copying landing page templates from the template library to campaign-specific
 directories for isolated deployment.
 """
+import gzip
+import os
 import shutil
 from pathlib import Path
 from typing import Tuple
@@ -17,6 +19,32 @@ TEMPLATES_BASE_DIR = Path("/templates/landing_pages")
 # Campaign deployments base directory
 CAMPAIGN_DEPLOYMENTS_DIR = Path("/app/campaign_landing_pages")
 
+# Text files that get a precompressed .gz sibling at deploy time
+PRECOMPRESS_SUFFIXES = {".html", ".css", ".js", ".svg", ".json", ".txt", ".xml"}
+
+
+def precompress_deployment(deployment_dir: Path) -> int:
+    """
+    Write a gzip copy (<file>.gz) next to every text file of a deployment.
+
+    The reverse proxy sends these as-is to clients that accept gzip
+    (file_server precompressed), so pages are not compressed per request.
+    Must run after every step that edits the deployed files.
+
+    Args:
+        deployment_dir: Deployed campaign or preview directory
+
+    Returns:
+        Number of files compressed
+    """
+    count = 0
+    for path in deployment_dir.rglob('*'):
+        if path.suffix.lower() in PRECOMPRESS_SUFFIXES and path.is_file():
+            compressed = gzip.compress(path.read_bytes(), compresslevel=9, mtime=0)
+            path.with_name(path.name + '.gz').write_bytes(compressed)
+            count += 1
+    return count
+
 
 def deploy_landing_page_to_campaign(campaign_id: int, template_path: str) -> Tuple[bool, str, str]:
     """
@@ -95,6 +123,17 @@ def deploy_landing_page_to_campaign(campaign_id: int, template_path: str) -> Tup
                     logger.warning(f"Failed to deploy info_page: {info_msg}")
                     # Don't fail the whole deployment, just log the warning
 
+        # Last step: the HTML has been edited above
+        try:
+            count = precompress_deployment(dest)
+            logger.info(f"Precompressed {count} files for campaign {campaign_id}")
+        except Exception as e:
+            logger.warning(f"Failed to precompress campaign files: {e}")
+
+        # The phishing server rebuilds its file list when the deployment
+        # root's inode or mtime changes; copytree copies the template's mtime
+        os.utime(dest)
+
         msg = f"Successfully deployed template '{template_path}' to campaign {campaign_id}"
         logger.info(msg)
         return True, msg, str(dest)
@@ -339,6 +378,13 @@ def deploy_preview(template_path: str) -> Tuple[bool, str, str]:
                     logger.warning(f"Failed to deploy info_page to preview: {info_msg}")
                     # Don't fail the whole preview deployment
 
+        # Last step: the HTML has been edited above
+        try:
+            count = precompress_deployment(preview_dir)
+            logger.info(f"Precompressed {count} preview files")
+        except Exception as e:
+            logger.warning(f"Failed to precompress preview files: {e}")
+
         # Create a special marker file so the phishing server knows this is preview mode
         marker_file = preview_dir / ".preview_mode"
         marker_file.write_text(template_path)
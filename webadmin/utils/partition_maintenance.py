@@ -0,0 +1,51 @@
+"""
+Scheduled maintenance of the monthly events partitions.
+
+Every serving webadmin process runs ensure_event_partitions() at startup and
+then once per EVENT_PARTITION_CHECK_INTERVAL seconds from a daemon thread, so
+the coming months' partitions exist before their rows arrive. Concurrent runs
+from several gunicorn workers are serialized by an advisory lock in
+db.partitions.
+
+The thread is started by gunicorn.conf.py (post_worker_init) and by app.py's
+development server, never by create_app(): alembic, `flask` commands and
+scripts build the app too and must not run DDL in the background.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from db.partitions import ensure_event_partitions
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks; 0 disables the thread (run `flask ensure-event-partitions`)
+EVENT_PARTITION_CHECK_INTERVAL = int(os.getenv("EVENT_PARTITION_CHECK_INTERVAL", "86400"))
+
+
+def run_partition_maintenance(app):
+    """Create any missing events partitions; errors are logged, not raised."""
+    from database import db
+
+    with app.app_context():
+        try:
+            with db.engine.begin() as connection:
+                names = ensure_event_partitions(connection)
+            logger.info("Event partitions present through %s", names[-1])
+        except Exception as e:
+            logger.warning("Could not ensure event partitions: %s", e)
+
+
+def start_partition_maintenance(app):
+    """Start the daemon thread that runs run_partition_maintenance() periodically."""
+    if EVENT_PARTITION_CHECK_INTERVAL <= 0 or not app.config.get("SQLALCHEMY_DATABASE_URI"):
+        return
+
+    def loop():
+        while True:
+            run_partition_maintenance(app)
+            time.sleep(EVENT_PARTITION_CHECK_INTERVAL)
+
+    threading.Thread(target=loop, name="event-partitions", daemon=True).start()
@@ -5,6 +5,7 @@ This module provides SQLAlchemy models and query functions for interacting
 with the PostgreSQL database during email campaign processing.
 """
 
+import base64
 import os
 import logging
 from datetime import datetime
@@ -20,10 +21,12 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    LargeBinary,
+    TypeDecorator,
     text,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.orm import sessionmaker, relationship, deferred, configure_mappers, Session
 from sqlalchemy.pool import QueuePool
 
 logger = logging.getLogger(__name__)
@@ -37,12 +40,36 @@ Base = declarative_base()
 # ============================================
 
 
+class TrackingToken(TypeDecorator):
+    """URL-safe base64 tracking token stored as its raw bytes (mirrors db.models)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Decode a token string to the bytes stored in the column."""
+        if value is None:
+            return None
+        try:
+            # 22-character tokens are sent without their "==" padding
+            return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        except ValueError:
+            # Not a token we issued; bind NULL so it matches nothing
+            return None
+
+    def process_result_value(self, value, dialect):
+        """Encode stored bytes back to the unpadded token string."""
+        if value is None:
+            return None
+        return base64.urlsafe_b64encode(value).decode().rstrip("=")
+
+
 class AdminUser(Base):
     """Admin users who create campaigns."""
 
     __tablename__ = "admin_users"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     # Add other fields as needed
 
 
@@ -51,7 +78,7 @@ class Department(Base):
 
     __tablename__ = "departments"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     # Add other fields as needed
 
 
@@ -61,7 +88,7 @@ class Target(Base):
     __tablename__ = "targets"
 
     id = Column(BigInteger, primary_key=True)
-    department_id = Column(BigInteger, ForeignKey("departments.id"))
+    department_id = Column(Integer, ForeignKey("departments.id"))
     email = Column(String(255))
     salutation = Column(String(20))  # Mr., Ms., Mrs., Dr., Prof., Mx.
     first_name = Column(String(100))
@@ -77,7 +104,7 @@ class TargetList(Base):
     __tablename__ = "target_lists"
 
     id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"))
     name = Column(String(255))
     description = Column(Text)
 
@@ -102,9 +129,9 @@ class EmailTemplate(Base):
 
     __tablename__ = "email_templates"
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
-    default_landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"))
+    default_landing_page_id = Column(Integer, ForeignKey("landing_pages.id"))
     name = Column(String(255))
     subject = Column(String(500))
     body_html = Column(Text)  # Database column name
@@ -123,15 +150,16 @@ class LandingPage(Base):
 
     __tablename__ = "landing_pages"
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"))
     name = Column(String(255))
     url_path = Column(String(255))  # e.g., /login-portal
     # Domain for email links (e.g., phishing.example.com)
     domain = Column(String(255), nullable=False)
-    html_content = Column(Text)
-    css_content = Column(Text)
-    js_content = Column(Text)
+    # Legacy content columns; never needed for sending mail
+    html_content = deferred(Column(Text), group="content")
+    css_content = deferred(Column(Text), group="content")
+    js_content = deferred(Column(Text), group="content")
     redirect_url = Column(String(500))  # Where to redirect after submission
     capture_credentials = Column(Integer, default=0)  # Boolean as int
     capture_form_data = Column(Integer, default=1)  # Boolean as int
@@ -144,10 +172,10 @@ class Campaign(Base):
 
     __tablename__ = "campaigns"
 
-    id = Column(BigInteger, primary_key=True)
-    created_by_id = Column(BigInteger, ForeignKey("admin_users.id"))
-    email_template_id = Column(BigInteger, ForeignKey("email_templates.id"))
-    landing_page_id = Column(BigInteger, ForeignKey("landing_pages.id"))
+    id = Column(Integer, primary_key=True)
+    created_by_id = Column(Integer, ForeignKey("admin_users.id"))
+    email_template_id = Column(Integer, ForeignKey("email_templates.id"))
+    landing_page_id = Column(Integer, ForeignKey("landing_pages.id"))
     name = Column(String(255))
     description = Column(Text)
     status = Column(String(50))  # draft, scheduled, active, completed, paused
@@ -171,7 +199,7 @@ class CampaignTargetList(Base):
     __tablename__ = "campaign_target_lists"
 
     id = Column(BigInteger, primary_key=True)
-    campaign_id = Column(BigInteger, ForeignKey("campaigns.id"))
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"))
     target_list_id = Column(BigInteger, ForeignKey("target_lists.id"))
 
     campaign = relationship("Campaign")
@@ -184,10 +212,10 @@ class CampaignTarget(Base):
     __tablename__ = "campaign_targets"
 
     id = Column(BigInteger, primary_key=True)
-    campaign_id = Column(BigInteger, ForeignKey("campaigns.id"))
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"))
     target_id = Column(BigInteger, ForeignKey("targets.id"))
     # email_template_id and landing_page_id removed - now inherited from campaign
-    tracking_token = Column(String(255), unique=True)  # Unique token for tracking
+    tracking_token = Column(TrackingToken)  # Unique token for tracking
     status = Column(String(50))  # pending, sent, opened, clicked, submitted
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -219,7 +247,7 @@ class EventType(Base):
 
     __tablename__ = "event_types"
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100))  # email_sent, email_opened, link_clicked, form_submitted
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -233,10 +261,10 @@ class Event(Base):
 
     id = Column(BigInteger, primary_key=True)
     campaign_target_id = Column(BigInteger, ForeignKey("campaign_targets.id"))
-    event_type_id = Column(BigInteger, ForeignKey("event_types.id"))
+    event_type_id = Column(Integer, ForeignKey("event_types.id"))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Database column name
     ip_address = Column(String(45))
-    user_agent = Column(Text)
+    user_agent_id = Column(BigInteger)  # user_agents.id; the worker never sets it
     browser = Column(String(100))
     os = Column(String(100))
     device_type = Column(String(50))
@@ -246,11 +274,24 @@ class Event(Base):
     event_type = relationship("EventType")
 
 
+# Resolve relationships now rather than on the first query in each worker
+configure_mappers()
+
+
 # ============================================
 # Database Connection
 # ============================================
 
 
+# libpq TCP keepalives so a dead peer is noticed in ~1 minute, not the kernel's hours
+TCP_KEEPALIVE_ARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+
 class DatabaseManager:
     """Manage database connections and queries."""
 
@@ -264,17 +305,23 @@ class DatabaseManager:
 
         # Create connection string
         self.connection_string = (
-            f"postgresql://{self.user}:{self.password}@" f"{self.host}:{self.port}/{self.database}"
+            f"postgresql+psycopg2://{self.user}:{self.password}@"
+            f"{self.host}:{self.port}/{self.database}"
         )
 
         # Create engine with connection pooling
         self.engine = create_engine(
             self.connection_string,
             poolclass=QueuePool,
-            pool_size=5,
-            max_overflow=10,
+            pool_size=10,
+            max_overflow=20,
             pool_pre_ping=True,  # Verify connections before using
-            pool_recycle=3600,  # Recycle connections after 1 hour
+            pool_recycle=1800,  # Recycle connections after 30 minutes
+            connect_args=TCP_KEEPALIVE_ARGS,
+            # Fold executemany INSERTs into multi-row VALUES pages and batch UPDATE/DELETE
+            executemany_mode="values_plus_batch",
+            insertmanyvalues_page_size=1000,
+            executemany_batch_page_size=500,
             echo=False,  # Set to True for SQL logging
         )
 
@@ -311,8 +358,8 @@ class DatabaseManager:
             True if connection successful, False otherwise
         """
         try:
-            with self.get_session() as session:
-                session.execute(text("SELECT 1"))
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
             logger.info("Database connection test: SUCCESS")
             return True
         except Exception as e:
@@ -462,12 +509,15 @@ def update_campaign_target_status(session: Session, campaign_target_id: int, sta
     return True
 
 
+# Committed event type ids by name; they never change once created
+_event_type_ids: Dict[str, int] = {}
+
+
 def log_event(
     session: Session,
     campaign_target_id: int,
     event_type_name: str,
     ip_address: Optional[str] = None,
-    user_agent: Optional[str] = None,
     metadata: Optional[str] = None,
 ) -> Event:
     """
@@ -478,27 +528,30 @@ def log_event(
         campaign_target_id: CampaignTarget ID
         event_type_name: Event type (email_sent, email_opened, link_clicked, etc.)
         ip_address: Client IP address
-        user_agent: Client user agent
         metadata: Additional metadata as JSON string
 
     Returns:
         Created Event object
     """
-    # Get or create event type
-    event_type = session.query(EventType).filter(EventType.name == event_type_name).first()
-
-    if not event_type:
-        event_type = EventType(name=event_type_name)
-        session.add(event_type)
-        session.flush()
+    # Get or create event type, caching ids that are already committed
+    event_type_id = _event_type_ids.get(event_type_name)
+    if event_type_id is None:
+        event_type = session.query(EventType).filter(EventType.name == event_type_name).first()
+
+        if event_type:
+            _event_type_ids[event_type_name] = event_type.id
+        else:
+            event_type = EventType(name=event_type_name)
+            session.add(event_type)
+            session.flush()
+        event_type_id = event_type.id
 
     # Create event
     event = Event(
         campaign_target_id=campaign_target_id,
-        event_type_id=event_type.id,
+        event_type_id=event_type_id,
         created_at=datetime.utcnow(),
         ip_address=ip_address,
-        user_agent=user_agent,
         # Note: event_metadata column was removed from model since it doesn't exist in DB
     )
     session.add(event)
@@ -234,18 +234,21 @@ class EmailRenderer:
             target_id: Target ID (optional)
 
         Returns:
-            Tracking token (32 characters, URL-safe base64)
+            Tracking token (22 characters, URL-safe base64)
+
+        The database stores tokens as their decoded bytes, so both branches
+        produce the canonical encoding of exactly 16 bytes.
         """
         if campaign_id is not None and target_id is not None:
             # Deterministic HMAC-based token for campaign-target pair
             message = f"c{campaign_id}t{target_id}".encode()
             signature = hmac.new(TRACKING_SECRET_KEY.encode(), message, hashlib.sha256).digest()
-            # URL-safe base64, truncated to 32 chars
-            token = base64.urlsafe_b64encode(signature).decode().rstrip("=")[:32]
+            # URL-safe base64 of the first 16 bytes
+            token = base64.urlsafe_b64encode(signature[:16]).decode().rstrip("=")
             return token
         else:
             # Fallback to random token
-            return secrets.token_urlsafe(24)[:32]
+            return secrets.token_urlsafe(16)
 
     def generate_tracking_number(self) -> str:
         """